@@ -0,0 +1,86 @@
+"""
+File: asyncindex.py
+
+An asyncio facade over a search tree that coalesces the lookups
+arriving within a short window into one batched find_many call.
+"""
+
+import asyncio
+
+
+class AsyncIndex(object):
+    """Serves await index.find(item) and await index.range(low, high)
+    from an event loop. Finds that arrive within window seconds of
+    the first pending one are answered together by one call to the
+    tree's find_many, which resolves them in sorted order; a batch
+    is also sent as soon as it reaches maxBatch items. Ranges holding
+    more than scanThreshold items are collected in executor, so that
+    the event loop is not held up by long scans. If the tree is
+    updated from other threads while a scan runs, it should be a
+    ConcurrentBST."""
+
+    def __init__(self, tree, window=0.0005, maxBatch=1024,
+                 scanThreshold=1000, executor=None):
+        """Sets the initial state of self to serve lookups on tree.
+        executor defaults to the event loop's default executor."""
+        self.tree = tree
+        self.window = window
+        self.maxBatch = maxBatch
+        self.scanThreshold = scanThreshold
+        self.executor = executor
+        self._pending = []
+        self._timer = None
+        self.requests = 0
+        self.batches = 0
+
+    def find(self, item):
+        """Returns a future for the item in the tree that matches
+        item, or None if there is none. A plain future awaits more
+        cheaply than a coroutine would."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        self.requests += 1
+        if len(self._pending) >= self.maxBatch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return future
+
+    async def contains(self, item):
+        """Returns True if item is in the tree, or False otherwise."""
+        return await self.find(item) is not None
+
+    def flush(self):
+        """Answers every pending find now, with one batched lookup."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self.batches += 1
+        try:
+            results = self.tree.find_many([item for item, future in pending])
+        except Exception as error:
+            for item, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (item, future), result in zip(pending, results):
+            # A caller that was cancelled no longer wants its result
+            if not future.done():
+                future.set_result(result)
+
+    async def range(self, low, high):
+        """Returns a list of the items in the tree, where
+        low <= item <= high, in sorted order."""
+        if self.tree.count_range(low, high) <= self.scanThreshold:
+            return list(self.tree.range_find(low, high))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, lambda: list(self.tree.range_find(low, high)))
+
+    def mean_batch(self):
+        """Returns the average number of finds answered per batch."""
+        return self.requests / self.batches if self.batches else 0.0
@@ -0,0 +1,86 @@
+"""
+File: avlbst.py
+
+A self-balancing (AVL) variant of the linked binary search tree.
+"""
+
+from linkedbst import LinkedBST, _refresh
+
+
+def _height(node):
+    """Returns the height of node, or -1 for an empty subtree."""
+    return -1 if node is None else node.height
+
+
+def _rotate_right(top):
+    """Rotates the subtree rooted at top to the right and
+    returns the new root of the subtree."""
+    newTop = top.left
+    top.left = newTop.right
+    newTop.right = top
+    _refresh(top)
+    _refresh(newTop)
+    return newTop
+
+
+def _rotate_left(top):
+    """Rotates the subtree rooted at top to the left and
+    returns the new root of the subtree."""
+    newTop = top.right
+    top.right = newTop.left
+    newTop.left = top
+    _refresh(top)
+    _refresh(newTop)
+    return newTop
+
+
+def _balance(node):
+    """Restores the AVL property at node, whose children are
+    already balanced, and returns the new root of the subtree."""
+    _refresh(node)
+    skew = _height(node.left) - _height(node.right)
+    if skew > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if skew < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+
+class AVLBST(LinkedBST):
+    """A link-based binary search tree that keeps the heights of the
+    two subtrees of every node within one of each other, so the
+    height of the tree stays O(log n) whatever the insertion order."""
+
+    def __init__(self, sourceCollection=None):
+        """Sets the initial state of self, which includes the
+        contents of sourceCollection, if it's present."""
+        LinkedBST.__init__(self, sourceCollection)
+
+    # Mutator methods
+    def _retrace(self, path):
+        """Rebalances the nodes on path, from the deepest one
+        up to the root, after a change below the last of them."""
+        for index in range(len(path) - 1, -1, -1):
+            node = path[index]
+            left, right = node.left, node.right
+            leftHeight = -1 if left is None else left.height
+            rightHeight = -1 if right is None else right.height
+            if -1 <= leftHeight - rightHeight <= 1:
+                # Already balanced, so only refresh the node
+                # (_refresh inlined for speed)
+                node.height = 1 + (leftHeight if leftHeight > rightHeight
+                                   else rightHeight)
+                node.size = 1 + (0 if left is None else left.size) \
+                    + (0 if right is None else right.size)
+                continue
+            newTop = _balance(node)
+            if index == 0:
+                self._root = newTop
+            elif path[index - 1].left is node:
+                path[index - 1].left = newTop
+            else:
+                path[index - 1].right = newTop
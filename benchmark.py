@@ -0,0 +1,604 @@
+"""
+File: benchmark.py
+
+Reproducible benchmarks of the search structures in this package
+against Python's built-in list, set and bisect on a sorted list.
+
+Every workload is generated from a seeded random.Random, each
+contestant runs warmup trials that are thrown away and then timed
+trials, and every operation is timed on its own so that latency
+percentiles can be reported. Results are written as JSON; a summary
+table goes to stderr. With --sweep, each contestant is instead built
+at a range of sizes, up to synthetic multi-million-key sets, and its
+build time, lookup latency, height, average search depth and
+comparisons per find are written as CSV. With --threads, a
+ConcurrentBST is read from a growing number of threads while one
+writer keeps adding and removing words, and the read throughput at
+each thread count is written as CSV. With --processes, batches of
+finds are split over a growing pool of worker processes that share
+one memory-mapped snapshot, and the throughput is written as CSV.
+
+Usage:
+    python3 benchmark.py [--words words.txt] [--size N] [--ops N]
+                         [--trials N] [--seed N] [--output FILE]
+                         [--contestants NAME ...] [--workloads NAME ...]
+    python3 benchmark.py --sweep [--sizes N|full ...] [--ops N]
+    python3 benchmark.py --threads N [N ...] [--size N] [--ops N]
+    python3 benchmark.py --processes N [N ...] [--size N] [--ops N]
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+from bisect import bisect_left, bisect_right, insort
+from statistics import median
+from time import perf_counter, perf_counter_ns
+
+from avlbst import AVLBST
+from bloomfilter import BloomFilteredBST
+from btreebst import BTreeBST
+from cachedbst import CachedBST
+from concurrentbst import ConcurrentBST
+from instrumentedbst import CountingKey
+from linkedbst import LinkedBST
+from parallelquery import ParallelIndex
+from splaybst import SplayBST
+from vocabulary import iter_words
+
+LOOKUPS = ("sorted", "random", "zipfian", "miss")
+WORKLOADS = LOOKUPS + ("batch", "insert", "delete", "range", "successor",
+                       "prefix")
+ZIPF_EXPONENT = 1.1
+MISS_RATIO = 0.9
+RANGE_WIDTH = 50
+# Completions returned per prefix query, as in type-ahead
+PREFIX_LIMIT = 10
+SCAPEGOAT_ALPHA = 0.7
+CACHE_SIZE = 4096
+# None stands for the whole words file
+SWEEP_SIZES = (1000, 10000, 100000, None, 1000000, 2000000)
+RESULT_COLUMNS = ("contestant", "workload", "median_us", "p95_us",
+                  "p99_us", "ops_per_sec")
+SWEEP_COLUMNS = ("size", "contestant", "build_s", "median_us", "p99_us",
+                 "height", "avg_depth", "comparisons_per_find")
+THREAD_COUNTS = (1, 2, 4, 8)
+THREAD_COLUMNS = ("threads", "reads", "elapsed_s", "reads_per_sec",
+                  "writes_per_sec")
+PROCESS_COLUMNS = ("processes", "attach_s", "finds", "elapsed_s",
+                   "finds_per_sec", "speedup")
+
+
+def load_vocabulary(path, size=None, seed=0):
+    """Returns the words of the file at path in file order. If size
+    is given, a seeded sample of that many words is kept, still in
+    file order."""
+    words = list(iter_words(path))
+    if size is not None and size < len(words):
+        picked = sorted(random.Random(seed).sample(range(len(words)), size))
+        words = [words[index] for index in picked]
+    return words
+
+
+def _misses(words, present, count, rng):
+    """Returns count distinct words that are not in present, derived
+    from words so that they fall between existing keys."""
+    misses = {}
+    while len(misses) < count:
+        word = rng.choice(words) + rng.choice("abcdefghijklmnopqrstuvwxyz")
+        if word not in present:
+            misses[word] = None
+    return list(misses)
+
+
+def make_workloads(words, ops, seed):
+    """Returns a dict mapping each workload name to its list of
+    operation arguments, all derived from seed."""
+    rng = random.Random(seed)
+    ordered = sorted(words)
+    present = set(words)
+    hot = ordered[:]
+    rng.shuffle(hot)
+    weights = [1 / rank ** ZIPF_EXPONENT for rank in range(1, len(hot) + 1)]
+    # A small vocabulary cannot supply that many distinct hits
+    hits = min(int(ops * (1 - MISS_RATIO)), len(words))
+    miss = rng.sample(words, hits) + _misses(words, present, ops - hits, rng)
+    rng.shuffle(miss)
+    ranges = []
+    for _ in range(ops):
+        low = rng.randrange(len(ordered))
+        high = min(low + rng.randrange(RANGE_WIDTH), len(ordered) - 1)
+        ranges.append((ordered[low], ordered[high]))
+    fresh = _misses(words, present, ops, rng)
+    return {
+        "sorted": sorted(rng.choices(words, k=ops)),
+        "random": rng.choices(words, k=ops),
+        "zipfian": rng.choices(hot, weights=weights, k=ops),
+        "miss": miss,
+        # Looked up with one find_many call per trial
+        "batch": rng.choices(words, k=ops),
+        # Each trial inserts the fresh words and then deletes them
+        # again, so the structure is the same for every trial
+        "insert": fresh,
+        "delete": fresh,
+        "range": ranges,
+        "successor": rng.choices(words, k=ops),
+        "prefix": [word[:rng.randint(1, 4)]
+                   for word in rng.choices(words, k=ops)],
+    }
+
+
+# Contestants: each builder takes the vocabulary in file order and a
+# seeded Random and returns a structure; each operation factory takes
+# the structure and returns a callable applied to one argument.
+
+def _list_ops(lyst):
+    return {"find": lyst.__contains__, "insert": lyst.append,
+            "delete": lyst.remove}
+
+
+def _set_ops(aSet):
+    return {"find": aSet.__contains__, "insert": aSet.add,
+            "delete": aSet.remove}
+
+
+def _bisect_ops(lyst):
+    def find(item):
+        index = bisect_left(lyst, item)
+        return index < len(lyst) and lyst[index] == item
+
+    def delete(item):
+        del lyst[bisect_left(lyst, item)]
+
+    def range_count(bounds):
+        return len(lyst[bisect_left(lyst, bounds[0]):
+                        bisect_right(lyst, bounds[1])])
+
+    def successor(item):
+        index = bisect_right(lyst, item)
+        return lyst[index] if index < len(lyst) else None
+
+    def prefix(text):
+        index = bisect_left(lyst, text)
+        return [word for word in lyst[index:index + PREFIX_LIMIT]
+                if word.startswith(text)]
+
+    return {"find": find, "insert": lambda item: insort(lyst, item),
+            "delete": delete, "range": range_count, "successor": successor,
+            "prefix": prefix}
+
+
+def _tree_ops(tree):
+    ops = {"find": tree.find, "insert": tree.add, "delete": tree.remove,
+           "range": lambda bounds: sum(1 for _ in tree.range_find(*bounds)),
+           "successor": tree.successor,
+           "prefix": lambda text: list(tree.prefix_find(text, PREFIX_LIMIT))}
+    if hasattr(tree, "find_many"):
+        ops["batch"] = tree.find_many
+    return ops
+
+
+def _build_by_adding(factory, words):
+    tree = factory()
+    for word in words:
+        tree.add(word)
+    return tree
+
+
+def _build_shuffled(words, rng):
+    words = words[:]
+    rng.shuffle(words)
+    return _build_by_adding(LinkedBST, words)
+
+
+def _frozen_ops(frozen):
+    ops = _tree_ops(frozen)
+    del ops["insert"], ops["delete"]
+    return ops
+
+
+# name: (builder, operations, slow); slow contestants only run when
+# they are named on the command line
+CONTESTANTS = {
+    "list": (lambda words, rng: list(words), _list_ops, True),
+    "set": (lambda words, rng: set(words), _set_ops, False),
+    "bisect": (lambda words, rng: sorted(words), _bisect_ops, False),
+    "linkedbst-alphabetic": (
+        lambda words, rng: _build_by_adding(LinkedBST, words),
+        _tree_ops, True),
+    "linkedbst-random": (_build_shuffled, _tree_ops, False),
+    "linkedbst-balanced": (
+        lambda words, rng: LinkedBST.from_sorted(sorted(words)),
+        _tree_ops, False),
+    "linkedbst-scapegoat": (
+        lambda words, rng: _build_by_adding(
+            lambda: LinkedBST(alpha=SCAPEGOAT_ALPHA), words),
+        _tree_ops, False),
+    "avlbst": (
+        lambda words, rng: _build_by_adding(AVLBST, words),
+        _tree_ops, False),
+    "concurrentbst": (
+        lambda words, rng: ConcurrentBST(words), _tree_ops, False),
+    "splaybst": (
+        lambda words, rng: SplayBST.from_sorted(sorted(words)),
+        _tree_ops, False),
+    "bloom-linkedbst": (
+        lambda words, rng: BloomFilteredBST(
+            LinkedBST.from_sorted(sorted(words))),
+        _tree_ops, False),
+    "cached-linkedbst": (
+        lambda words, rng: CachedBST(
+            LinkedBST.from_sorted(sorted(words)), CACHE_SIZE),
+        _tree_ops, False),
+    "btree": (
+        lambda words, rng: _build_by_adding(BTreeBST, words),
+        _tree_ops, False),
+    "frozenbst": (
+        lambda words, rng: LinkedBST.from_sorted(sorted(words)).freeze(),
+        _frozen_ops, False),
+}
+
+
+def _percentile(ordered, p):
+    """Returns the p-th percentile of an ascending list by the
+    nearest-rank method."""
+    index = max(0, -(-len(ordered) * p // 100) - 1)
+    return ordered[index]
+
+
+def _time_each(operation, arguments):
+    """Returns the latency of each call, in nanoseconds."""
+    latencies = []
+    clock = perf_counter_ns
+    for argument in arguments:
+        start = clock()
+        operation(argument)
+        latencies.append(clock() - start)
+    return latencies
+
+
+def _time_batch(operation, arguments):
+    """Times one call of operation on the whole list of arguments and
+    returns the mean latency per argument, once for each argument, in
+    nanoseconds. A batch has no per-item latencies, so its percentiles
+    all equal the mean."""
+    start = perf_counter_ns()
+    operation(arguments)
+    elapsed = perf_counter_ns() - start
+    return [elapsed // len(arguments)] * len(arguments)
+
+
+def _summary(name, workload, latencies, trialTimes, buildTime):
+    """Returns the JSON record for one contestant and workload."""
+    latencies.sort()
+    opsPerTrial = len(latencies) // len(trialTimes)
+    return {
+        "contestant": name,
+        "workload": workload,
+        "ops": opsPerTrial,
+        "trials": len(trialTimes),
+        "build_s": round(buildTime, 6),
+        "median_us": round(median(latencies) / 1000, 3),
+        "p95_us": round(_percentile(latencies, 95) / 1000, 3),
+        "p99_us": round(_percentile(latencies, 99) / 1000, 3),
+        "ops_per_sec": round(opsPerTrial / median(trialTimes)),
+    }
+
+
+def run_contestant(name, words, workloads, names, trials, warmup, seed):
+    """Builds one contestant and returns its JSON records for the
+    named workloads it supports."""
+    build, operations, slow = CONTESTANTS[name]
+    start = perf_counter()
+    structure = build(words, random.Random(seed))
+    buildTime = perf_counter() - start
+    ops = operations(structure)
+    # Every trial replays the same arguments, so a cache kept from an
+    # earlier trial would answer them all; each trial starts cold
+    clearCache = getattr(structure, "clear_cache", None)
+
+    # Inserts and deletes always run as a pair, so that every trial
+    # starts from the same structure
+    groups = []
+    for workload in names:
+        if workload in ("insert", "delete"):
+            if ("insert", "delete") not in groups:
+                groups.append(("insert", "delete"))
+        else:
+            groups.append((workload,))
+
+    records = []
+    for phases in groups:
+        operations = [ops.get("find" if phase in LOOKUPS else phase)
+                      for phase in phases]
+        if None in operations:
+            continue
+        latencies = {phase: [] for phase in phases}
+        times = {phase: [] for phase in phases}
+        for trial in range(warmup + trials):
+            if clearCache is not None:
+                clearCache()
+            for phase, operation in zip(phases, operations):
+                timer = _time_batch if phase == "batch" else _time_each
+                began = perf_counter()
+                taken = timer(operation, workloads[phase])
+                elapsed = perf_counter() - began
+                if trial >= warmup:
+                    latencies[phase].extend(taken)
+                    times[phase].append(elapsed)
+        for phase in phases:
+            if phase in names:
+                records.append(_summary(name, phase, latencies[phase],
+                                        times[phase], buildTime))
+    return records
+
+
+def run(words, contestants, names, ops, trials, warmup, seed):
+    """Runs every named contestant over every named workload and
+    returns the JSON document."""
+    workloads = make_workloads(words, ops, seed)
+    results = []
+    for name in contestants:
+        results.extend(run_contestant(name, words, workloads, names,
+                                      trials, warmup, seed))
+    return {
+        "config": {"size": len(words), "ops": ops, "trials": trials,
+                   "warmup": warmup, "seed": seed,
+                   "contestants": list(contestants),
+                   "workloads": list(names),
+                   "python": platform.python_version()},
+        "results": results,
+    }
+
+
+def synthetic_vocabulary(size, seed):
+    """Returns size distinct random lowercase keys of 6 to 12 letters,
+    in sorted order."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    keys = set()
+    while len(keys) < size:
+        keys.add("".join(rng.choices(letters, k=rng.randint(6, 12))))
+    return sorted(keys)
+
+
+def sweep_vocabulary(path, size, seed):
+    """Returns the vocabulary for one point of a sweep: a sample of
+    the words in path, all of them if size is None, or synthetic
+    keys once size exceeds the dictionary."""
+    words = load_vocabulary(path, size, seed)
+    if size is not None and size > len(words):
+        return synthetic_vocabulary(size, seed)
+    return words
+
+
+def run_sweep(path, sizes, contestants, ops, seed):
+    """Builds each contestant at each size and returns one record per
+    pair with its build time, lookup latency, tree height, average
+    search depth and comparisons per find."""
+    records = []
+    for size in sizes:
+        words = sweep_vocabulary(path, size, seed)
+        probes = random.Random(seed).choices(words, k=ops)
+        for name in contestants:
+            build, operations, slow = CONTESTANTS[name]
+            start = perf_counter()
+            structure = build(words, random.Random(seed))
+            buildTime = perf_counter() - start
+            find = operations(structure)["find"]
+            latencies = sorted(_time_each(find, probes))
+            CountingKey.comparisons = 0
+            for probe in probes:
+                find(CountingKey(probe))
+            record = {
+                "size": len(words),
+                "contestant": name,
+                "build_s": round(buildTime, 6),
+                "median_us": round(median(latencies) / 1000, 3),
+                "p99_us": round(_percentile(latencies, 99) / 1000, 3),
+                "height": None,
+                "avg_depth": None,
+                "comparisons_per_find": round(
+                    CountingKey.comparisons / len(probes), 2),
+            }
+            if hasattr(structure, "search_depth"):
+                record["height"] = structure.height()
+                record["avg_depth"] = round(sum(
+                    map(structure.search_depth, probes)) / len(probes), 2)
+            records.append(record)
+            del structure, find
+    return records
+
+
+def run_threads(words, threadCounts, ops, seed):
+    """For each thread count, builds a ConcurrentBST of words and
+    times that many threads doing ops finds each, while one writer
+    thread adds and removes fresh words until they finish. Returns one
+    record per thread count with the read and write throughput."""
+    rng = random.Random(seed)
+    fresh = _misses(words, set(words), ops, rng)
+    records = []
+    for count in threadCounts:
+        tree = ConcurrentBST(words)
+        probes = [rng.choices(words, k=ops) for _ in range(count)]
+        barrier = threading.Barrier(count + 1)
+        done = threading.Event()
+        writes = [0]
+
+        def read(batch):
+            barrier.wait()
+            for word in batch:
+                tree.find(word)
+
+        def write():
+            barrier.wait()
+            while not done.is_set():
+                for word in fresh:
+                    tree.add(word)
+                    tree.remove(word)
+                    writes[0] += 2
+                    if done.is_set():
+                        break
+
+        readers = [threading.Thread(target=read, args=(batch,))
+                   for batch in probes]
+        writer = threading.Thread(target=write)
+        for thread in readers[1:] + [writer]:
+            thread.start()
+        start = perf_counter()
+        # The first reader runs in this thread, so the clock starts
+        # as soon as every thread has reached the barrier
+        read(probes[0])
+        for thread in readers[1:]:
+            thread.join()
+        elapsed = perf_counter() - start
+        done.set()
+        writer.join()
+        records.append({
+            "threads": count,
+            "reads": count * ops,
+            "elapsed_s": round(elapsed, 6),
+            "reads_per_sec": round(count * ops / elapsed),
+            "writes_per_sec": round(writes[0] / elapsed),
+        })
+    return records
+
+
+def run_processes(words, processCounts, ops, trials, seed):
+    """Saves words as a snapshot file and, for each process count,
+    times a ParallelIndex with that many workers answering a batch of
+    ops finds. Returns one record per process count with the time
+    taken to start and attach the workers, the best of trials batch
+    times, and the speedup over the first count."""
+    probes = random.Random(seed).choices(words, k=ops)
+    records = []
+    handle, path = tempfile.mkstemp(suffix=".bst")
+    os.close(handle)
+    try:
+        LinkedBST.from_sorted(sorted(set(words))).save(path)
+        for count in processCounts:
+            start = perf_counter()
+            index = ParallelIndex(path, count)
+            # The first batch waits for every worker to attach
+            index.find_many(probes[:count])
+            attach = perf_counter() - start
+            times = []
+            for trial in range(trials):
+                start = perf_counter()
+                index.find_many(probes)
+                times.append(perf_counter() - start)
+            index.close()
+            elapsed = min(times)
+            records.append({
+                "processes": count,
+                "attach_s": round(attach, 6),
+                "finds": ops,
+                "elapsed_s": round(elapsed, 6),
+                "finds_per_sec": round(ops / elapsed),
+                "speedup": round(records[0]["elapsed_s"] / elapsed, 2)
+                if records else 1.0,
+            })
+    finally:
+        os.remove(path)
+    return records
+
+
+def format_table(records, header):
+    """Returns the given columns of records as an aligned text table."""
+    rows = [header] + [tuple(str(record[key]) for key in header)
+                       for record in records]
+    widths = [max(len(row[column]) for row in rows)
+              for column in range(len(header))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width
+                               in zip(row, widths)) for row in rows)
+
+
+def _size_argument(text):
+    """Parses a sweep size: an int, or "full" for the whole file."""
+    return None if text == "full" else int(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--words", default="words.txt")
+    parser.add_argument("--size", type=int, default=None,
+                        help="sample this many words (default: all)")
+    parser.add_argument("--ops", type=int, default=10000,
+                        help="operations per trial")
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="-",
+                        help="JSON (CSV with --sweep, --threads or "
+                             "--processes) output file "
+                             "(default: stdout)")
+    parser.add_argument("--contestants", nargs="+", choices=CONTESTANTS,
+                        default=[name for name, (build, ops, slow)
+                                 in CONTESTANTS.items() if not slow])
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS,
+                        default=list(WORKLOADS))
+    parser.add_argument("--sweep", action="store_true",
+                        help="measure scaling over --sizes instead")
+    parser.add_argument("--sizes", nargs="+", type=_size_argument,
+                        default=list(SWEEP_SIZES),
+                        help='sweep sizes; "full" is the whole file')
+    parser.add_argument("--threads", nargs="+", type=int, default=None,
+                        help="measure concurrent read throughput at "
+                             "these reader thread counts instead, "
+                             "e.g. %s" % " ".join(map(str, THREAD_COUNTS)))
+    parser.add_argument("--processes", nargs="+", type=int, default=None,
+                        help="measure parallel batch finds at these "
+                             "worker process counts instead")
+    args = parser.parse_args(argv)
+    if args.ops < 1:
+        parser.error("--ops must be at least 1")
+    if args.trials < 1:
+        parser.error("--trials must be at least 1")
+    if args.warmup < 0:
+        parser.error("--warmup must not be negative")
+    if args.size is not None and args.size < 1:
+        parser.error("--size must be at least 1")
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        if args.threads or args.processes:
+            words = load_vocabulary(args.words, args.size, args.seed)
+            if args.threads:
+                records = run_threads(words, args.threads, args.ops,
+                                      args.seed)
+                columns = THREAD_COLUMNS
+            else:
+                records = run_processes(words, args.processes, args.ops,
+                                        args.trials, args.seed)
+                columns = PROCESS_COLUMNS
+            print(format_table(records, columns), file=sys.stderr)
+            writer = csv.DictWriter(output, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+        elif args.sweep:
+            records = run_sweep(args.words, args.sizes, args.contestants,
+                                args.ops, args.seed)
+            print(format_table(records, SWEEP_COLUMNS), file=sys.stderr)
+            writer = csv.DictWriter(output, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            words = load_vocabulary(args.words, args.size, args.seed)
+            document = run(words, args.contestants, args.workloads,
+                           args.ops, args.trials, args.warmup, args.seed)
+            print(format_table(document["results"], RESULT_COLUMNS),
+                  file=sys.stderr)
+            json.dump(document, output, indent=2)
+            print(file=output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
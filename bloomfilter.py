@@ -0,0 +1,190 @@
+"""
+File: bloomfilter.py
+
+A Bloom filter: a set of bits that answers "definitely absent" or
+"possibly present" for any item, and a tree wrapper that uses one to
+turn most lookup misses away before they reach the tree.
+"""
+
+from math import ceil, log
+from treewrapper import TreeWrapper
+
+MIN_CAPACITY = 1024
+MASK64 = (1 << 64) - 1
+
+
+def _mix(value):
+    """Returns value scrambled by Fibonacci hashing into 64 bits.
+    Python hashes small ints and integral floats to themselves, so
+    their raw bits would make the probes of one item fall on adjacent
+    bits. One multiply and shift is enough to spread them, at a
+    fraction of the cost of a full splitmix64 finaliser."""
+    value = (value * 0x9E3779B97F4A7C15) & MASK64
+    return value ^ (value >> 29)
+
+
+class BloomFilter(object):
+    """A Bloom filter sized for capacity items at a false positive
+    rate of errorRate. Items cannot be removed. The k bit positions
+    of an item are derived from the two halves of its mixed hash, so
+    they are only stable within one process."""
+
+    def __init__(self, capacity, errorRate=0.01):
+        """Sets the initial state of self to an empty filter."""
+        if not 0 < errorRate < 1:
+            raise ValueError("errorRate must lie strictly between 0 and 1.")
+        self.capacity = max(capacity, 1)
+        self.errorRate = errorRate
+        self._bitCount = max(8, ceil(-self.capacity * log(errorRate)
+                                     / log(2) ** 2))
+        self._hashCount = max(1, round(self._bitCount / self.capacity
+                                       * log(2)))
+        self._bits = bytearray((self._bitCount + 7) // 8)
+        self._size = 0
+
+    def __len__(self):
+        """Returns the number of items added to self."""
+        return self._size
+
+    def add(self, item):
+        """Sets the bits of item."""
+        value = _mix(hash(item))
+        step = (value >> 32) | 1
+        position = value & 0xFFFFFFFF
+        bits = self._bits
+        for _ in range(self._hashCount):
+            position = (position + step) % self._bitCount
+            bits[position >> 3] |= 1 << (position & 7)
+        self._size += 1
+
+    def __contains__(self, item):
+        """Returns False if item was never added to self, or True if
+        it may have been."""
+        value = _mix(hash(item))
+        step = (value >> 32) | 1
+        position = value & 0xFFFFFFFF
+        bits = self._bits
+        bitCount = self._bitCount
+        for _ in range(self._hashCount):
+            position = (position + step) % bitCount
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class BloomFilteredBST(TreeWrapper):
+    """Wraps a tree and keeps a Bloom filter of its items, so that
+    find, __contains__, find_many and contains_many answer most
+    misses without searching the tree. The filter is rebuilt from the
+    tree when it is rebalanced, when it fills past its capacity, and
+    when removes, which a Bloom filter cannot forget, reach half of
+    the items it holds."""
+
+    def __init__(self, tree, errorRate=0.01):
+        """Sets the initial state of self to filter lookups on tree."""
+        TreeWrapper.__init__(self, tree)
+        self.errorRate = errorRate
+        self.reset_stats()
+        self._rebuild()
+
+    def reset_stats(self):
+        """Clears the filter counters."""
+        self.negatives = 0
+        self.truePositives = 0
+        self.falsePositives = 0
+
+    def _rebuild(self):
+        """Refills the filter from the items of the tree, with room
+        for twice as many."""
+        self._filter = BloomFilter(max(MIN_CAPACITY, 2 * len(self._tree)),
+                                   self.errorRate)
+        for item in self._tree.inorder():
+            self._filter.add(item)
+        self._removed = 0
+
+    # Accessor methods
+    def find(self, item):
+        """If item matches an item in the tree, returns the
+        matched item, or None otherwise."""
+        if item not in self._filter:
+            self.negatives += 1
+            return None
+        result = self._tree.find(item)
+        if result is None:
+            self.falsePositives += 1
+        else:
+            self.truePositives += 1
+        return result
+
+    def __contains__(self, item):
+        """Returns True if item is in the tree, or False otherwise."""
+        return self.find(item) is not None
+
+    def find_many(self, items):
+        """Returns a list holding, for each of items in turn, the
+        matched item in the tree or None. Only the items that pass
+        the filter are looked up, in one batch."""
+        items = list(items)
+        results = [None] * len(items)
+        passed = [index for index, item in enumerate(items)
+                  if item in self._filter]
+        found = self._tree.find_many([items[index] for index in passed])
+        for index, result in zip(passed, found):
+            results[index] = result
+        hits = sum(result is not None for result in found)
+        self.negatives += len(items) - len(passed)
+        self.truePositives += hits
+        self.falsePositives += len(passed) - hits
+        return results
+
+    def contains_many(self, items):
+        """Returns a list of booleans telling, for each of items
+        in turn, whether it is in the tree."""
+        return [result is not None for result in self.find_many(items)]
+
+    def filter_stats(self):
+        """Returns the filter counters, and the share of lookups for
+        absent items that the filter failed to turn away, as a dict."""
+        misses = self.negatives + self.falsePositives
+        return {
+            "negatives": self.negatives,
+            "true_positives": self.truePositives,
+            "false_positives": self.falsePositives,
+            "false_positive_rate":
+                self.falsePositives / misses if misses else None,
+            "filter_items": len(self._filter),
+            "filter_capacity": self._filter.capacity,
+        }
+
+    # Mutator methods
+    def add(self, item):
+        """Adds item to the tree and the filter."""
+        self._tree.add(item)
+        if len(self._filter) >= self._filter.capacity:
+            self._rebuild()
+        else:
+            self._filter.add(item)
+
+    def update(self, iterable):
+        """Adds the items of iterable to the tree and the filter."""
+        self._tree.update(iterable)
+        self._rebuild()
+
+    def remove(self, item):
+        """Removes item from the tree and returns it.
+        Raises: KeyError if item is not in the tree."""
+        itemRemoved = self._tree.remove(item)
+        self._removed += 1
+        if 2 * self._removed >= len(self._filter):
+            self._rebuild()
+        return itemRemoved
+
+    def clear(self):
+        """Makes the tree and the filter empty."""
+        self._tree.clear()
+        self._rebuild()
+
+    def rebalance(self):
+        """Rebalances the tree and rebuilds the filter."""
+        self._tree.rebalance()
+        self._rebuild()
@@ -35,14 +35,14 @@ def main():
     print("\n\ninorder traversal: ", end="")
     for item in tree.inorder(): print(item, end = " ")
     
-    #print("\n\npreorder traversal: ", end="")
-    #for item in tree.preorder(): print(item, end = " ")
+    print("\n\npreorder traversal: ", end="")
+    for item in tree.preorder(): print(item, end = " ")
     
-    #print("\n\npostorder traversal: ", end="")
-    #for item in tree.postorder(): print(item, end = " ")
+    print("\n\npostorder traversal: ", end="")
+    for item in tree.postorder(): print(item, end = " ")
     
-    #print("\n\nlevelorder traversal: ", end="")
-    #for item in tree.levelorder(): print(item, end = " ")
+    print("\n\nlevelorder traversal: ", end="")
+    for item in tree.levelorder(): print(item, end = " ")
 
     print("\n\nRemoving all items:", end = " ")
     for item in "ABCDEFG":
@@ -64,8 +64,8 @@ def main():
     #random.shuffle(lyst)
     tree = LinkedBST(lyst)
     print(tree, tree.height())
-    print(tree.isBalanced())
-    print(tree.rangeFind(30,91))
+    print(tree.is_balanced())
+    print(list(tree.range_find(30,91)))
     print(tree.successor(20))
     print(tree.predecessor(50))
     tree.rebalance()
@@ -6,7 +6,20 @@ Author: Ken Lambert
 class BSTNode(object):
     """Represents a node for a linked binary search tree."""
 
+    __slots__ = ("data", "left", "right", "height", "size")
+
     def __init__(self, data, left = None, right = None):
         self.data = data
         self.left = left
         self.right = right
+        # height is the number of edges on the longest path down to
+        # a leaf, and size the number of items in the subtree rooted
+        # at this node; both follow from the children given here.
+        if left is None and right is None:
+            self.height = 0
+            self.size = 1
+        else:
+            self.height = 1 + max(-1 if left is None else left.height,
+                                  -1 if right is None else right.height)
+            self.size = 1 + (0 if left is None else left.size) + \
+                (0 if right is None else right.size)
@@ -0,0 +1,493 @@
+"""
+File: btreebst.py
+
+A B+ tree with the interface of the linked binary search tree.
+"""
+
+from bisect import bisect_left, bisect_right, insort_right
+from heapq import merge
+from math import ceil, log
+from abstractcollection import AbstractCollection
+from btreenode import BTreeNode
+from linkedbst import prefix_bound
+
+DEFAULT_ORDER = 64
+
+
+def _groups(count, capacity):
+    """Returns the sizes of the groups that count items are split
+    into, at most capacity each and, if there are two or more groups,
+    at least (capacity + 1) // 2 each."""
+    groups = -(-count // capacity)
+    if groups <= 1:
+        return [count]
+    return [count // groups + (1 if index < count % groups else 0)
+            for index in range(groups)]
+
+
+def _count(node):
+    """Returns the number of items under node."""
+    return len(node.keys) if node.children is None else node.size
+
+
+class BTreeBST(AbstractCollection):
+    """A B+ tree of the given order: every node holds at most order
+    keys, and every node but the root at least order // 2. Items live
+    in the leaves, which are linked in sorted order, and the keys of
+    each node are searched with bisect. A find therefore makes
+    O(log n / log order) hops between nodes, and range scans follow
+    the leaf links. Every key of children[i] lies between keys[i - 1]
+    and keys[i], inclusive, so equal items may sit in either of the
+    two children beside a matching key. Internal nodes count the
+    items under them, so rank, select and the counting queries take
+    O(order * height) without visiting the items."""
+
+    def __init__(self, sourceCollection=None, order=DEFAULT_ORDER):
+        """Sets the initial state of self, which includes the
+        contents of sourceCollection, if it's present."""
+        if order < 4:
+            raise ValueError("order must be at least 4.")
+        self.order = order
+        self._root = BTreeNode([])
+        AbstractCollection.__init__(self)
+        if sourceCollection:
+            self.update(sourceCollection)
+
+    @classmethod
+    def from_sorted(cls, iterable, order=DEFAULT_ORDER):
+        """Returns a new tree holding the items of iterable, built
+        bottom up in O(n) with full leaves.
+        Precondition: the items come in ascending order."""
+        tree = cls(order=order)
+        tree._build(list(iterable))
+        return tree
+
+    def _build(self, items):
+        """Replaces the contents of self with the sorted list items."""
+        self._size = len(items)
+        nodes = []
+        lows = []
+        start = 0
+        for count in _groups(len(items), self.order):
+            leaf = BTreeNode(items[start:start + count])
+            if nodes:
+                nodes[-1].next = leaf
+            nodes.append(leaf)
+            lows.append(items[start] if count else None)
+            start += count
+        while len(nodes) > 1:
+            parents = []
+            parentLows = []
+            start = 0
+            # order keys separate order + 1 children
+            for count in _groups(len(nodes), self.order + 1):
+                parents.append(BTreeNode(lows[start + 1:start + count],
+                                         nodes[start:start + count]))
+                parentLows.append(lows[start])
+                start += count
+            nodes, lows = parents, parentLows
+        self._root = nodes[0]
+
+    # Accessor methods
+    def __iter__(self):
+        """Supports an inorder traversal on a view of self."""
+        return self.inorder()
+
+    def inorder(self):
+        """Supports an inorder traversal on a view of self, following
+        the links between the leaves."""
+        node = self._root
+        while node.children is not None:
+            node = node.children[0]
+        while node is not None:
+            yield from node.keys
+            node = node.next
+
+    def preorder(self):
+        """Supports a preorder traversal on a view of self. Every item
+        lives in a leaf and all leaves are at the same depth, so a
+        preorder walk reaches the items from left to right, as
+        inorder does."""
+        return self.inorder()
+
+    def postorder(self):
+        """Supports a postorder traversal on a view of self, which
+        reaches the leaves, and so the items, in inorder."""
+        return self.inorder()
+
+    def levelorder(self):
+        """Supports a levelorder traversal on a view of self. All
+        items are on the bottom level, so they come in inorder."""
+        return self.inorder()
+
+    def __add__(self, other):
+        """Returns a new tree containing the contents of self and
+        other, built in O(n) by merging both in order."""
+        if isinstance(other, BTreeBST):
+            others = other.inorder()
+        else:
+            others = sorted(other)
+        return type(self).from_sorted(merge(self.inorder(), others),
+                                      self.order)
+
+    def _lower_leaf(self, item):
+        """Returns the leftmost leaf that can hold item, and the index
+        of the first key there that is not less than item. The index
+        may be the length of the leaf, when the item belongs at the
+        start of the next one."""
+        node = self._root
+        while node.children is not None:
+            node = node.children[bisect_left(node.keys, item)]
+        return node, bisect_left(node.keys, item)
+
+    def __contains__(self, item):
+        """Returns True if item is in self, or False otherwise."""
+        return self.find(item) is not None
+
+    def find(self, item):
+        """If item matches an item in self, returns the
+        matched item, or None otherwise."""
+        node = self._root
+        while node.children is not None:
+            node = node.children[bisect_left(node.keys, item)]
+        keys = node.keys
+        index = bisect_left(keys, item)
+        if index == len(keys):
+            node = node.next
+            if node is None:
+                return None
+            keys = node.keys
+            index = 0
+        return keys[index] if keys[index] == item else None
+
+    def find_many(self, items):
+        """Returns a list holding, for each of items in turn, the
+        matched item in self or None. The probes are resolved in
+        sorted order, walking along the leaf chain and descending from
+        the root again only when a probe is beyond the next leaf."""
+        items = list(items)
+        results = [None] * len(items)
+        node = None
+        for index in sorted(range(len(items)), key=items.__getitem__):
+            item = items[index]
+            if node is None:
+                node = self._lower_leaf(item)[0]
+            elif node.keys and node.keys[-1] < item:
+                following = node.next
+                if following is not None and not following.keys[-1] < item:
+                    node = following
+                else:
+                    node = self._lower_leaf(item)[0]
+            keys = node.keys
+            position = bisect_left(keys, item)
+            if position < len(keys):
+                if keys[position] == item:
+                    results[index] = keys[position]
+            elif node.next is not None and node.next.keys[0] == item:
+                results[index] = node.next.keys[0]
+        return results
+
+    def contains_many(self, items):
+        """Returns a list of booleans telling, for each of items
+        in turn, whether it is in self."""
+        return [result is not None for result in self.find_many(items)]
+
+    def _count_below(self, item, inclusive=False):
+        """Returns the number of items in self that are less than
+        item, or less than or equal to it if inclusive is True."""
+        search = bisect_right if inclusive else bisect_left
+        count = 0
+        node = self._root
+        while node.children is not None:
+            index = search(node.keys, item)
+            for child in node.children[:index]:
+                count += _count(child)
+            node = node.children[index]
+        return count + search(node.keys, item)
+
+    def rank(self, item):
+        """Returns the number of items in self that are
+        smaller than item."""
+        return self._count_below(item)
+
+    def select(self, k):
+        """Returns the k-th smallest item, counting from 0.
+        Raises: IndexError if k is out of range."""
+        if k < 0:
+            k += self._size
+        if not 0 <= k < self._size:
+            raise IndexError("Tree index out of range.")
+        node = self._root
+        while node.children is not None:
+            for child in node.children:
+                count = _count(child)
+                if k < count:
+                    node = child
+                    break
+                k -= count
+        return node.keys[k]
+
+    def count_range(self, low, high):
+        """Returns the number of items in self, where
+        low <= item <= high, without visiting them."""
+        if high < low:
+            return 0
+        return self._count_below(high, True) - self._count_below(low)
+
+    def median(self):
+        """Returns the lower median of the items in self.
+        Raises: IndexError if self is empty."""
+        return self.select((self._size - 1) // 2)
+
+    def percentile(self, p):
+        """Returns the item at the p-th percentile, 0 <= p <= 100,
+        by the nearest-rank method.
+        Raises: IndexError if self is empty."""
+        if not 0 <= p <= 100:
+            raise ValueError("Percentile must be between 0 and 100.")
+        return self.select(max(0, ceil(p * self._size / 100) - 1))
+
+    def height(self):
+        """Returns the number of edges on a path from the root
+        to a leaf."""
+        height = 0
+        node = self._root
+        while node.children is not None:
+            height += 1
+            node = node.children[0]
+        return height
+
+    def search_depth(self, item):
+        """Returns the number of nodes that find visits when it
+        looks for item, whether or not item is present."""
+        node, index = self._lower_leaf(item)
+        depth = self.height() + 1
+        return depth + 1 if index == len(node.keys) and node.next else depth
+
+    def range_find(self, low, high):
+        """Yields the items in self, where low <= item <= high, in
+        sorted order, walking the leaves from the first match."""
+        node, index = self._lower_leaf(low)
+        while node is not None:
+            keys = node.keys
+            stop = bisect_right(keys, high, index)
+            yield from keys[index:stop]
+            if stop < len(keys):
+                return
+            node = node.next
+            index = 0
+
+    def prefix_find(self, prefix, limit=None):
+        """Yields the items in self that start with prefix, in sorted
+        order, at most limit of them if limit is given.
+        Precondition: the items are strings."""
+        if limit is not None and limit <= 0:
+            return
+        bound = prefix_bound(prefix)
+        count = 0
+        node, index = self._lower_leaf(prefix)
+        while node is not None:
+            keys = node.keys
+            stop = len(keys) if bound is None else \
+                bisect_left(keys, bound, index)
+            if limit is not None:
+                stop = min(stop, index + limit - count)
+            yield from keys[index:stop]
+            count += stop - index
+            if stop < len(keys) or count == limit:
+                return
+            node = node.next
+            index = 0
+
+    def count_prefix(self, prefix):
+        """Returns the number of items in self that start with prefix,
+        from the counts in the internal nodes, without visiting them.
+        Precondition: the items are strings."""
+        bound = prefix_bound(prefix)
+        above = self._size if bound is None else self._count_below(bound)
+        return above - self._count_below(prefix)
+
+    def successor(self, item):
+        """Returns the smallest item that is larger than
+        item, or None if there is no such item."""
+        node = self._root
+        while node.children is not None:
+            node = node.children[bisect_right(node.keys, item)]
+        index = bisect_right(node.keys, item)
+        if index == len(node.keys):
+            node = node.next
+            if node is None:
+                return None
+            index = 0
+        return node.keys[index]
+
+    def predecessor(self, item):
+        """Returns the largest item that is smaller than
+        item, or None if there is no such item."""
+        # The nearest subtree to the left of the search path holds
+        # the answer if the leaf that is reached does not
+        left = None
+        node = self._root
+        while node.children is not None:
+            index = bisect_left(node.keys, item)
+            if index > 0:
+                left = node.children[index - 1]
+            node = node.children[index]
+        index = bisect_left(node.keys, item)
+        if index > 0:
+            return node.keys[index - 1]
+        if left is None:
+            return None
+        while left.children is not None:
+            left = left.children[-1]
+        return left.keys[-1]
+
+    # Mutator methods
+    def clear(self):
+        """Makes self become empty."""
+        self._root = BTreeNode([])
+        self._size = 0
+
+    def add(self, item):
+        """Adds item to self."""
+        path = []
+        node = self._root
+        while node.children is not None:
+            index = bisect_right(node.keys, item)
+            path.append((node, index))
+            node = node.children[index]
+        insort_right(node.keys, item)
+        self._size += 1
+        for parent, index in path:
+            parent.size += 1
+
+        # Split full nodes on the way back up
+        while len(node.keys) > self.order:
+            middle = len(node.keys) // 2
+            if node.children is None:
+                sibling = BTreeNode(node.keys[middle:], None, node.next)
+                node.next = sibling
+                separator = sibling.keys[0]
+            else:
+                sibling = BTreeNode(node.keys[middle + 1:],
+                                    node.children[middle + 1:])
+                separator = node.keys[middle]
+                del node.children[middle + 1:]
+                node.size -= sibling.size
+            del node.keys[middle:]
+            if not path:
+                self._root = BTreeNode([separator], [node, sibling])
+                return
+            node, index = path.pop()
+            node.keys.insert(index, separator)
+            node.children.insert(index + 1, sibling)
+
+    def update(self, iterable):
+        """Adds the items of iterable to self. A batch that is large
+        relative to self is merged with it and the whole tree is
+        rebuilt in O(n + k); a smaller one is added item by item."""
+        batch = sorted(iterable)
+        if not batch:
+            return
+        if len(batch) * log(len(self) + 2, 2) >= len(self):
+            self._build(list(merge(self.inorder(), batch)))
+        else:
+            for item in batch:
+                self.add(item)
+
+    def remove(self, item):
+        """Precondition: item is in self.
+        Raises: KeyError if item is not in self.
+        postcondition: item is removed from self."""
+        itemRemoved = self._remove(self._root, item)
+        if itemRemoved is None:
+            raise KeyError("Item not in tree.")
+        if self._root.children is not None and not self._root.keys:
+            self._root = self._root.children[0]
+        self._size -= 1
+        return itemRemoved
+
+    def _remove(self, node, item):
+        """Removes item from the subtree rooted at node and returns
+        it, or returns None if it is not there. Children left with too
+        few keys are refilled from a sibling or merged with one."""
+        keys = node.keys
+        index = bisect_left(keys, item)
+        if node.children is None:
+            if index < len(keys) and keys[index] == item:
+                return keys.pop(index)
+            return None
+        # An equal item may also lie right of each matching key
+        while True:
+            itemRemoved = self._remove(node.children[index], item)
+            if itemRemoved is not None:
+                node.size -= 1
+                self._fix_child(node, index)
+                return itemRemoved
+            if index == len(keys) or keys[index] != item:
+                return None
+            index += 1
+
+    def _fix_child(self, node, index):
+        """Refills or merges children[index] of node if it has fewer
+        than order // 2 keys."""
+        children = node.children
+        child = children[index]
+        minimum = self.order // 2
+        if len(child.keys) >= minimum:
+            return
+        isLeaf = child.children is None
+        if index > 0 and len(children[index - 1].keys) > minimum:
+            left = children[index - 1]
+            if isLeaf:
+                child.keys.insert(0, left.keys.pop())
+                node.keys[index - 1] = child.keys[0]
+            else:
+                moved = left.children.pop()
+                child.keys.insert(0, node.keys[index - 1])
+                child.children.insert(0, moved)
+                node.keys[index - 1] = left.keys.pop()
+                left.size -= _count(moved)
+                child.size += _count(moved)
+        elif index + 1 < len(children) and \
+                len(children[index + 1].keys) > minimum:
+            right = children[index + 1]
+            if isLeaf:
+                child.keys.append(right.keys.pop(0))
+                node.keys[index] = right.keys[0]
+            else:
+                moved = right.children.pop(0)
+                child.keys.append(node.keys[index])
+                child.children.append(moved)
+                node.keys[index] = right.keys.pop(0)
+                right.size -= _count(moved)
+                child.size += _count(moved)
+        else:
+            # Merge the child with a sibling that is at its minimum
+            if index == 0:
+                index = 1
+            left, right = children[index - 1], children[index]
+            if isLeaf:
+                left.keys.extend(right.keys)
+                left.next = right.next
+            else:
+                left.keys.append(node.keys[index - 1])
+                left.keys.extend(right.keys)
+                left.children.extend(right.children)
+                left.size += right.size
+            del node.keys[index - 1]
+            del children[index]
+
+    def replace(self, item, newItem):
+        """Precondition: item == newItem.
+        If item is in self, replaces it with newItem and
+        returns the old item, or returns None otherwise."""
+        node, index = self._lower_leaf(item)
+        if index == len(node.keys):
+            node = node.next
+            index = 0
+        if node is None or node.keys[index] != item:
+            return None
+        oldItem = node.keys[index]
+        node.keys[index] = newItem
+        return oldItem
@@ -0,0 +1,22 @@
+"""
+File: btreenode.py
+"""
+
+class BTreeNode(object):
+    """Represents a node for a B+ tree. A leaf holds items in keys and
+    links to the next leaf; an internal node holds one more child than
+    keys, and keys[i] separates children[i] from children[i + 1]."""
+
+    __slots__ = ("keys", "children", "next", "size")
+
+    def __init__(self, keys, children = None, next = None):
+        self.keys = keys
+        # None for a leaf.
+        self.children = children
+        # The leaf to the right of this one, or None.
+        self.next = next
+        # Number of items under an internal node; a leaf holds
+        # len(keys) items and leaves this None.
+        self.size = None if children is None else \
+            sum(len(child.keys) if child.children is None else child.size
+                for child in children)
@@ -0,0 +1,111 @@
+"""
+File: cachedbst.py
+
+A bounded least-recently-used cache of lookup results in front of
+a binary search tree.
+"""
+
+from collections import OrderedDict
+from treewrapper import TreeWrapper
+
+_MISSING = object()
+
+
+class CachedBST(TreeWrapper):
+    """Wraps a tree and remembers the results of the last maxSize
+    distinct find and __contains__ calls, misses included, so that a
+    repeated lookup costs one dict probe instead of a search. add,
+    update, remove and replace drop the entries of the items they
+    change; clear and rebalance drop every entry. Items must be
+    hashable."""
+
+    def __init__(self, tree, maxSize=4096):
+        """Sets the initial state of self to cache lookups on tree."""
+        if maxSize < 1:
+            raise ValueError("maxSize must be at least 1.")
+        TreeWrapper.__init__(self, tree)
+        self.maxSize = maxSize
+        self._cache = OrderedDict()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clears the cache counters."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear_cache(self):
+        """Drops every cached result, leaving the counters alone."""
+        self._cache.clear()
+
+    # Accessor methods
+    def find(self, item):
+        """If item matches an item in the tree, returns the
+        matched item, or None otherwise."""
+        cache = self._cache
+        result = cache.get(item, _MISSING)
+        if result is not _MISSING:
+            self.hits += 1
+            cache.move_to_end(item)
+            return result
+        self.misses += 1
+        result = self._tree.find(item)
+        cache[item] = result
+        if len(cache) > self.maxSize:
+            cache.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def __contains__(self, item):
+        """Returns True if item is in the tree, or False otherwise."""
+        return self.find(item) is not None
+
+    def cache_stats(self):
+        """Returns the cache counters and hit ratio as a dict."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "entries": len(self._cache),
+            "max_size": self.maxSize,
+        }
+
+    # Mutator methods
+    def add(self, item):
+        """Adds item to the tree."""
+        self._tree.add(item)
+        self._cache.pop(item, None)
+
+    def update(self, iterable):
+        """Adds the items of iterable to the tree."""
+        items = list(iterable)
+        self._tree.update(items)
+        for item in items:
+            self._cache.pop(item, None)
+
+    def remove(self, item):
+        """Removes item from the tree and returns it.
+        Raises: KeyError if item is not in the tree."""
+        itemRemoved = self._tree.remove(item)
+        self._cache.pop(item, None)
+        return itemRemoved
+
+    def replace(self, item, newItem):
+        """If item is in the tree, replaces it with newItem and
+        returns the old item, or returns None otherwise."""
+        oldItem = self._tree.replace(item, newItem)
+        self._cache.pop(item, None)
+        self._cache.pop(newItem, None)
+        return oldItem
+
+    def clear(self):
+        """Makes the tree and the cache empty."""
+        self._tree.clear()
+        self.clear_cache()
+
+    def rebalance(self):
+        """Rebalances the tree and empties the cache."""
+        self._tree.rebalance()
+        self.clear_cache()
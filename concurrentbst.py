@@ -0,0 +1,79 @@
+"""
+File: concurrentbst.py
+
+A linked binary search tree that can be read from many threads
+while other threads update it.
+"""
+
+from threading import RLock
+from linkedbst import LinkedBST
+from persistentbst import PersistentBST, copy_insert, copy_remove, \
+    copy_replace
+
+
+class ConcurrentBST(LinkedBST):
+    """A link-based binary search tree whose nodes are never changed
+    once they are reachable from the root. Writers are serialised by
+    a lock and copy the path they change, then publish the new root in
+    one assignment. Readers take no lock: each query reads the root
+    once and sees a consistent tree, however many updates run
+    meanwhile."""
+
+    def __init__(self, sourceCollection=None):
+        """Sets the initial state of self, which includes the
+        contents of sourceCollection, if it's present."""
+        self._lock = RLock()
+        LinkedBST.__init__(self, sourceCollection)
+
+    # Accessor methods
+    def __len__(self):
+        """Returns the number of items in self, as counted by the
+        root that is current when it is called."""
+        root = self._root
+        return 0 if root is None else root.size
+
+    def snapshot(self):
+        """Returns the current contents of self as a PersistentBST in
+        O(1). It shares the nodes of self, which are never changed, so
+        it stays as it was while self is updated."""
+        return PersistentBST.from_root(self._root)
+
+    # Mutator methods
+    def clear(self):
+        """Makes self become empty."""
+        with self._lock:
+            LinkedBST.clear(self)
+
+    def add(self, item):
+        """Adds item to the tree."""
+        with self._lock:
+            self._root = copy_insert(self._root, item)
+            self._size += 1
+
+    def update(self, iterable):
+        """Adds the items of iterable to the tree."""
+        with self._lock:
+            LinkedBST.update(self, iterable)
+
+    def remove(self, item):
+        """Precondition: item is in self.
+        Raises: KeyError if item is not in self.
+        postcondition: item is removed from self."""
+        with self._lock:
+            self._root, itemRemoved = copy_remove(self._root, item)
+            self._size -= 1
+            return itemRemoved
+
+    def replace(self, item, newItem):
+        """
+        If item is in self, replaces it with newItem and
+        returns the old item, or returns None otherwise."""
+        with self._lock:
+            self._root, oldItem = copy_replace(self._root, item, newItem)
+            return oldItem
+
+    def rebalance(self):
+        """Rebalances the tree into freshly allocated nodes, which
+        readers of the old root never see."""
+        with self._lock:
+            LinkedBST.rebalance(self)
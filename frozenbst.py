@@ -0,0 +1,172 @@
+"""
+File: frozenbst.py
+
+A read-only snapshot of a binary search tree, stored as one
+contiguous sorted list and searched with bisect.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableSequence, Sequence
+from math import ceil
+from abstractcollection import AbstractCollection
+from linkedbst import prefix_bound
+from snapshot import SnapshotView, write_snapshot
+
+
+class FrozenBST(AbstractCollection):
+    """An immutable sorted-array index with the lookup interface
+    of LinkedBST."""
+
+    def __init__(self, sortedItems=()):
+        """Sets the initial state of self to hold sortedItems.
+        An immutable sequence, such as a MappedVocabulary, is
+        searched in place; anything else is copied into a list.
+        Precondition: the items come in ascending order."""
+        AbstractCollection.__init__(self)
+        if isinstance(sortedItems, Sequence) and \
+                not isinstance(sortedItems, MutableSequence):
+            self._items = sortedItems
+        else:
+            self._items = list(sortedItems)
+        self._size = len(self._items)
+
+    @classmethod
+    def load(cls, path):
+        """Returns a frozen tree that searches the snapshot file at
+        path in place, through a memory-mapped SnapshotView."""
+        return cls(SnapshotView.open(path))
+
+    def save(self, path):
+        """Writes the items of self, which must be strings, to a
+        binary snapshot file at path."""
+        write_snapshot(path, self._items)
+
+    # Accessor methods
+    def __iter__(self):
+        """Supports an inorder traversal on a view of self."""
+        return iter(self._items)
+
+    def inorder(self):
+        """Supports an inorder traversal on a view of self."""
+        return iter(self._items)
+
+    def __contains__(self, item):
+        """Returns True if target is found or False otherwise."""
+        index = bisect_left(self._items, item)
+        return index < self._size and self._items[index] == item
+
+    def find(self, item):
+        """If item matches an item in self, returns the
+        matched item, or None otherwise."""
+        index = bisect_left(self._items, item)
+        if index < self._size and self._items[index] == item:
+            return self._items[index]
+        return None
+
+    def find_many(self, items):
+        """Returns a list holding, for each of items in turn, the
+        matched item in self or None. Each probe is a single bisect,
+        which is already cheaper than sorting the batch."""
+        lyst = self._items
+        size = self._size
+        results = []
+        for item in items:
+            index = bisect_left(lyst, item)
+            if index < size and lyst[index] == item:
+                results.append(lyst[index])
+            else:
+                results.append(None)
+        return results
+
+    def contains_many(self, items):
+        """Returns a list of booleans telling, for each of items
+        in turn, whether it is in self."""
+        return [result is not None for result in self.find_many(items)]
+
+    def range_find(self, low, high):
+        """Yields the items in self, where low <= item <= high,
+        in sorted order."""
+        start = bisect_left(self._items, low)
+        stop = bisect_right(self._items, high, start)
+        return map(self._items.__getitem__, range(start, stop))
+
+    def _prefix_span(self, prefix):
+        """Returns the start and stop indexes of the items in self
+        that start with prefix."""
+        start = bisect_left(self._items, prefix)
+        bound = prefix_bound(prefix)
+        if bound is None:
+            return start, self._size
+        return start, bisect_left(self._items, bound, start)
+
+    def prefix_find(self, prefix, limit=None):
+        """Yields the items in self that start with prefix, in sorted
+        order, at most limit of them if limit is given.
+        Precondition: the items are strings."""
+        start, stop = self._prefix_span(prefix)
+        if limit is not None:
+            stop = min(stop, start + max(0, limit))
+        return map(self._items.__getitem__, range(start, stop))
+
+    def count_prefix(self, prefix):
+        """Returns the number of items in self that start with prefix.
+        Precondition: the items are strings."""
+        start, stop = self._prefix_span(prefix)
+        return stop - start
+
+    def successor(self, item):
+        """Returns the smallest item that is larger than
+        item, or None if there is no such item."""
+        index = bisect_right(self._items, item)
+        return self._items[index] if index < self._size else None
+
+    def predecessor(self, item):
+        """Returns the largest item that is smaller than
+        item, or None if there is no such item."""
+        index = bisect_left(self._items, item)
+        return self._items[index - 1] if index > 0 else None
+
+    def rank(self, item):
+        """Returns the number of items in self that are
+        smaller than item."""
+        return bisect_left(self._items, item)
+
+    def select(self, k):
+        """Returns the k-th smallest item, counting from 0.
+        Raises: IndexError if k is out of range."""
+        if not -self._size <= k < self._size:
+            raise IndexError("Tree index out of range.")
+        return self._items[k]
+
+    def count_range(self, low, high):
+        """Returns the number of items in self, where
+        low <= item <= high."""
+        if high < low:
+            return 0
+        return bisect_right(self._items, high) - bisect_left(self._items, low)
+
+    def median(self):
+        """Returns the lower median of the items in self.
+        Raises: IndexError if self is empty."""
+        return self.select((self._size - 1) // 2)
+
+    def percentile(self, p):
+        """Returns the item at the p-th percentile, 0 <= p <= 100,
+        by the nearest-rank method.
+        Raises: IndexError if self is empty."""
+        if not 0 <= p <= 100:
+            raise ValueError("Percentile must be between 0 and 100.")
+        return self.select(max(0, ceil(p * self._size / 100) - 1))
+
+    # Mutator methods
+    def add(self, item):
+        """Raises: TypeError, since a frozen tree is read-only."""
+        raise TypeError("A frozen tree is read-only.")
+
+    def remove(self, item):
+        """Raises: TypeError, since a frozen tree is read-only."""
+        raise TypeError("A frozen tree is read-only.")
+
+    def clear(self):
+        """Raises: TypeError, since a frozen tree is read-only."""
+        raise TypeError("A frozen tree is read-only.")
@@ -0,0 +1,183 @@
+"""
+File: instrumentedbst.py
+
+Opt-in instrumentation for binary search trees: per-operation call
+counts, comparison counts, latency histograms and search depth
+distributions, plus the live height and balance of the tree.
+"""
+
+from collections import Counter
+from time import perf_counter_ns
+from treewrapper import TreeWrapper
+
+
+class CountingKey(object):
+    """Wraps a probe so that every comparison made against it is
+    counted in CountingKey.comparisons."""
+
+    __slots__ = ("item",)
+    comparisons = 0
+
+    def __init__(self, item):
+        self.item = item
+
+    def __hash__(self):
+        return hash(self.item)
+
+    def __eq__(self, other):
+        CountingKey.comparisons += 1
+        return self.item == other
+
+    def __ne__(self, other):
+        CountingKey.comparisons += 1
+        return self.item != other
+
+    def __lt__(self, other):
+        CountingKey.comparisons += 1
+        return self.item < other
+
+    def __le__(self, other):
+        CountingKey.comparisons += 1
+        return self.item <= other
+
+    def __gt__(self, other):
+        CountingKey.comparisons += 1
+        return self.item > other
+
+    def __ge__(self, other):
+        CountingKey.comparisons += 1
+        return self.item >= other
+
+
+class OperationStats(object):
+    """Counters for one kind of operation. Latencies are kept in
+    power-of-two buckets of nanoseconds: bucket b counts the calls
+    that took less than 2 ** b ns and at least 2 ** (b - 1) ns."""
+
+    __slots__ = ("calls", "comparisons", "totalNs", "latencies", "depths")
+
+    def __init__(self):
+        self.calls = 0
+        self.comparisons = 0
+        self.totalNs = 0
+        self.latencies = Counter()
+        self.depths = Counter()
+
+    def record(self, elapsedNs, comparisons, depth):
+        """Adds one call to the counters."""
+        self.calls += 1
+        self.comparisons += comparisons
+        self.totalNs += elapsedNs
+        self.latencies[elapsedNs.bit_length()] += 1
+        if depth is not None:
+            self.depths[depth] += 1
+
+    def as_dict(self):
+        """Returns the counters as a plain dict."""
+        return {
+            "calls": self.calls,
+            "comparisons": self.comparisons,
+            "total_ns": self.totalNs,
+            "mean_ns": self.totalNs / self.calls if self.calls else None,
+            "latency_ns_below": {2 ** bucket: count for bucket, count
+                                 in sorted(self.latencies.items())},
+            "depths": dict(sorted(self.depths.items())),
+        }
+
+
+class InstrumentedBST(TreeWrapper):
+    """Wraps a tree and records what find, __contains__, add, remove
+    and rebalance cost. Comparisons and depths are those of a search
+    for the operation's item. While enabled is False the wrapper only
+    forwards calls; to pay nothing at all, use the tree directly."""
+
+    OPERATIONS = ("find", "contains", "add", "remove")
+
+    def __init__(self, tree, enabled=True):
+        """Sets the initial state of self to instrument tree."""
+        TreeWrapper.__init__(self, tree)
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        """Clears all counters."""
+        self._stats = {name: OperationStats() for name in self.OPERATIONS}
+        self._rebalances = 0
+        self._rebalanceNs = 0
+
+    def _probe(self, item):
+        """Returns the comparisons made by a search for item and its
+        depth, or None for the depth if the tree does not report it.
+        The search runs outside the timed call, so that the counting
+        probe does not inflate the recorded latency."""
+        before = CountingKey.comparisons
+        searchDepth = getattr(self._tree, "search_depth", None)
+        if searchDepth is None:
+            self._tree.find(CountingKey(item))
+            depth = None
+        else:
+            depth = searchDepth(CountingKey(item))
+        return CountingKey.comparisons - before, depth
+
+    def _record(self, name, operation, item):
+        """Runs operation on item, records it under name and returns
+        its result."""
+        comparisons, depth = self._probe(item)
+        start = perf_counter_ns()
+        try:
+            return operation(item)
+        finally:
+            elapsed = perf_counter_ns() - start
+            self._stats[name].record(elapsed, comparisons, depth)
+
+    # Accessor methods
+    def find(self, item):
+        """If item matches an item in the tree, returns the
+        matched item, or None otherwise."""
+        if not self.enabled:
+            return self._tree.find(item)
+        return self._record("find", self._tree.find, item)
+
+    def __contains__(self, item):
+        """Returns True if item is in the tree, or False otherwise."""
+        if not self.enabled:
+            return item in self._tree
+        return self._record("contains", self._tree.__contains__, item)
+
+    # Mutator methods
+    def add(self, item):
+        """Adds item to the tree."""
+        if not self.enabled:
+            return self._tree.add(item)
+        return self._record("add", self._tree.add, item)
+
+    def remove(self, item):
+        """Removes item from the tree and returns it.
+        Raises: KeyError if item is not in the tree."""
+        if not self.enabled:
+            return self._tree.remove(item)
+        return self._record("remove", self._tree.remove, item)
+
+    def rebalance(self):
+        """Rebalances the tree, timing the rebuild."""
+        if not self.enabled:
+            return self._tree.rebalance()
+        start = perf_counter_ns()
+        self._tree.rebalance()
+        self._rebalanceNs += perf_counter_ns() - start
+        self._rebalances += 1
+
+    def snapshot(self):
+        """Returns every counter, and the current size, height and
+        balance of the tree, as a dict."""
+        return {
+            "operations": {name: stats.as_dict()
+                           for name, stats in self._stats.items()},
+            "rebalance": {"calls": self._rebalances,
+                          "total_ns": self._rebalanceNs},
+            "size": len(self._tree),
+            "height": self._tree.height()
+            if hasattr(self._tree, "height") else None,
+            "is_balanced": self._tree.is_balanced()
+            if hasattr(self._tree, "is_balanced") else None,
+        }
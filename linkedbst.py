@@ -3,77 +3,274 @@ File: linkedbst.py
 Author: Ken Lambert
 """
 
-from time import perf_counter
 from abstractcollection import AbstractCollection
 from bstnode import BSTNode
-from linkedstack import LinkedStack
-from math import log
-import random
+from linkedqueue import LinkedQueue
+from snapshot import read_snapshot, write_snapshot
+from heapq import merge
+from math import ceil, log
+from sys import maxunicode
 
 
-class LinkedBST(AbstractCollection):
-    """An link-based binary search tree implementation."""
+def _size(node):
+    """Returns the number of items in the subtree rooted at node."""
+    return 0 if node is None else node.size
+
+
+def _refresh(node):
+    """Recomputes the height and the size of node from its children
+    and returns node."""
+    left, right = node.left, node.right
+    if left is None:
+        if right is None:
+            node.height, node.size = 0, 1
+        else:
+            node.height, node.size = right.height + 1, right.size + 1
+    elif right is None:
+        node.height, node.size = left.height + 1, left.size + 1
+    else:
+        node.height = 1 + (left.height if left.height > right.height
+                           else right.height)
+        node.size = 1 + left.size + right.size
+    return node
+
+
+def _count_below(node, item, inclusive=False):
+    """Returns the number of items in the subtree rooted at node that
+    are less than item, or less than or equal to it if inclusive is
+    True, in O(height)."""
+    count = 0
+    while node is not None:
+        if node.data < item or (inclusive and node.data == item):
+            count += 1 + _size(node.left)
+            node = node.right
+        else:
+            node = node.left
+    return count
+
+
+def _select(node, k):
+    """Returns the k-th smallest item in the subtree rooted at node,
+    counting from 0.
+    Raises: IndexError if k is out of range."""
+    if k < 0:
+        k += _size(node)
+    if not 0 <= k < _size(node):
+        raise IndexError("Tree index out of range.")
+    while True:
+        leftSize = _size(node.left)
+        if k < leftSize:
+            node = node.left
+        elif k == leftSize:
+            return node.data
+        else:
+            k -= leftSize + 1
+            node = node.right
+
+
+def prefix_bound(prefix):
+    """Returns the smallest string that is larger than every string
+    starting with prefix, or None if there is no such string."""
+    prefix = prefix.rstrip(chr(maxunicode))
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
 
-    def __init__(self, sourceCollection=None):
+
+def _build_balanced(items, low, high, relink=False):
+    """Links items[low:high], which are in sorted order, into a
+    perfectly balanced subtree and returns its root. If relink is
+    True, items are nodes, which are relinked instead of new ones
+    being allocated."""
+    if low >= high:
+        return None
+    middle = (low + high) // 2
+    node = items[middle] if relink else BSTNode(items[middle])
+    node.left = _build_balanced(items, low, middle, relink)
+    node.right = _build_balanced(items, middle + 1, high, relink)
+    return _refresh(node)
+
+
+def _balanced_order(items):
+    """Yields sorted items level by level in the order that links
+    them into a balanced shape when added one at a time."""
+    queue = LinkedQueue()
+    queue.add((0, len(items)))
+    while not queue.isEmpty():
+        low, high = queue.pop()
+        if low < high:
+            middle = (low + high) // 2
+            yield items[middle]
+            queue.add((low, middle))
+            queue.add((middle + 1, high))
+
+
+def _inorder_nodes(node):
+    """Returns the nodes of the subtree rooted at node as a list,
+    in sorted order."""
+    nodes = []
+    stack = []
+    while node is not None or stack:
+        if node is not None:
+            stack.append(node)
+            node = node.left
+        else:
+            node = stack.pop()
+            nodes.append(node)
+            node = node.right
+    return nodes
+
+
+class LinkedBST(AbstractCollection):
+    """An link-based binary search tree implementation.
+
+    If alpha is given, 0.5 < alpha < 1, the tree rebalances itself
+    in the manner of a scapegoat tree. When add links a leaf deeper
+    than log base 1/alpha of the size, the deepest ancestor holding
+    more than alpha of its items in one child is rebuilt perfectly
+    balanced; when removes shrink the tree below alpha of its largest
+    size since the last full rebuild, the whole tree is rebuilt.
+    Updates then cost amortised O(log n), without rotations or
+    scheduled full rebuilds."""
+
+    def __init__(self, sourceCollection=None, alpha=None):
         """Sets the initial state of self, which includes the
         contents of sourceCollection, if it's present."""
+        if alpha is not None and not 0.5 < alpha < 1:
+            raise ValueError("alpha must lie strictly between 0.5 and 1.")
         self._root = None
-        AbstractCollection.__init__(self, sourceCollection)
+        self.alpha = alpha
+        # The largest size since the last full rebuild
+        self._maxSize = 0
+        AbstractCollection.__init__(self)
+        if sourceCollection:
+            self.update(sourceCollection)
+
+    @classmethod
+    def from_sorted(cls, iterable):
+        """Returns a new, perfectly balanced tree holding the items
+        of iterable in O(n) time.
+        Precondition: the items come in ascending order."""
+        tree = cls()
+        items = list(iterable)
+        tree._root = _build_balanced(items, 0, len(items))
+        tree._size = tree._maxSize = len(items)
+        return tree
+
+    @staticmethod
+    def _sorted_items(iterable):
+        """Returns the items of iterable as a sorted list, walking
+        a LinkedBST in order instead of sorting it."""
+        if isinstance(iterable, LinkedBST):
+            return list(iterable.inorder())
+        return sorted(iterable)
 
     # Accessor methods
+    def __add__(self, other):
+        """Returns a new, balanced tree containing the contents
+        of self and other."""
+        return self.union(other)
+
+    def __eq__(self, other):
+        """Returns True if self and other hold the same items,
+        whatever their shapes, or False otherwise."""
+        if self is other:
+            return True
+        if type(self) != type(other) or len(self) != len(other):
+            return False
+        return all(item == otherItem for item, otherItem
+                   in zip(self.inorder(), other.inorder()))
+
+    def union(self, other):
+        """Returns a new, balanced tree containing the contents
+        of self and other, built in O(n) by merging both in order."""
+        result = type(self).from_sorted(
+            merge(self.inorder(), self._sorted_items(other)))
+        result.alpha = self.alpha
+        return result
+
     def __str__(self):
         """Returns a string representation with the tree rotated
         90 degrees counterclockwise."""
-
-        def recurse(node, level):
-            s = ""
-            if node != None:
-                s += recurse(node.right, level + 1)
-                s += "| " * level
-                s += str(node.data) + "\n"
-                s += recurse(node.left, level + 1)
-            return s
-
-        return recurse(self._root, 0)
+        lines = []
+        stack = []
+        node, level = self._root, 0
+        while node is not None or stack:
+            if node is not None:
+                stack.append((node, level))
+                node, level = node.right, level + 1
+            else:
+                node, level = stack.pop()
+                lines.append("| " * level + str(node.data) + "\n")
+                node, level = node.left, level + 1
+        return "".join(lines)
 
     def __iter__(self):
         """Supports a preorder traversal on a view of self."""
-        if not self.isEmpty():
-            stack = LinkedStack()
-            stack.push(self._root)
-            while not stack.isEmpty():
-                node = stack.pop()
-                # yield node.data
-                yield node
-                if node.right != None:
-                    stack.push(node.right)
-                if node.left != None:
-                    stack.push(node.left)
+        return self.preorder()
+
+    def _preorder_nodes(self):
+        """Yields the nodes of self in preorder, keeping only the
+        pending right children on the stack."""
+        root = self._root
+        stack = [root] if root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
 
     def preorder(self):
         """Supports a preorder traversal on a view of self."""
-        return None
+        for node in self._preorder_nodes():
+            yield node.data
 
     def inorder(self):
         """Supports an inorder traversal on a view of self."""
-        lyst = list()
-
-        def recurse(node):
-            if node != None:
-                recurse(node.left)
-                lyst.append(node.data)
-                recurse(node.right)
-
-        recurse(self._root)
-        return iter(lyst)
+        stack = []
+        node = self._root
+        while node is not None or stack:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                yield node.data
+                node = node.right
 
     def postorder(self):
         """Supports a postorder traversal on a view of self."""
-        return None
+        stack = []
+        node = self._root
+        lastVisited = None
+        while node is not None or stack:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                top = stack[-1]
+                if top.right is not None and top.right is not lastVisited:
+                    node = top.right
+                else:
+                    stack.pop()
+                    yield top.data
+                    lastVisited = top
 
     def levelorder(self):
         """Supports a levelorder traversal on a view of self."""
-        return None
+        queue = LinkedQueue()
+        root = self._root
+        if root is not None:
+            queue.add(root)
+        while not queue.isEmpty():
+            node = queue.pop()
+            yield node.data
+            if node.left is not None:
+                queue.add(node.left)
+            if node.right is not None:
+                queue.add(node.right)
 
     def __contains__(self, item):
         """Returns True if target is found or False otherwise."""
@@ -82,133 +279,174 @@ class LinkedBST(AbstractCollection):
     def find(self, item):
         """If item matches an item in self, returns the
         matched item, or None otherwise."""
-        try:
-            node = self._root
-            while True:
+        node = self._root
+        while node is not None:
+            if item == node.data:
+                return node.data
+            elif item < node.data:
+                node = node.left
+            else:
+                node = node.right
+        return None
+
+    def find_many(self, items):
+        """Returns a list holding, for each of items in turn, the
+        matched item in self or None. The probes are resolved in
+        sorted order, each one resuming from the deepest node on the
+        previous search path whose subtree can still contain it."""
+        items = list(items)
+        results = [None] * len(items)
+        # Each path entry pairs a node with the smallest item above
+        # its subtree, or None when there is no such bound
+        path = []
+        root = self._root
+        for index in sorted(range(len(items)), key=items.__getitem__):
+            item = items[index]
+            while path and path[-1][1] is not None \
+                    and not item < path[-1][1]:
+                path.pop()
+            if path:
+                node, bound = path.pop()
+            else:
+                node, bound = root, None
+            while node is not None:
+                path.append((node, bound))
                 if item == node.data:
-                    return node.data
+                    results[index] = node.data
+                    break
                 elif item < node.data:
+                    bound = node.data
                     node = node.left
                 else:
                     node = node.right
-        except ValueError:
-            return None
+        return results
+
+    def contains_many(self, items):
+        """Returns a list of booleans telling, for each of items
+        in turn, whether it is in self."""
+        return [result is not None for result in self.find_many(items)]
 
     # Mutator methods
     def clear(self):
         """Makes self become empty."""
         self._root = None
-        self._size = 0
+        self._size = self._maxSize = 0
 
     def add(self, item):
         """Adds item to the tree."""
-        if self._root is not None:
-            node = self._root
-        else:
-            self._root = BSTNode(item)
-            return
-        while True:
+        path = []
+        node = self._root
+        while node is not None:
+            path.append(node)
             if item < node.data:
-                if node.left is None:
-                    node.left = BSTNode(item)
-                    break
-                else:
-                    node = node.left
+                node = node.left
             else:
-                if node.right is None:
-                    node.right = BSTNode(item)
-                    break
-                else:
-                    node = node.right
-            self._size += 1
+                node = node.right
+        if not path:
+            self._root = BSTNode(item)
+        elif item < path[-1].data:
+            path[-1].left = BSTNode(item)
+        else:
+            path[-1].right = BSTNode(item)
+        self._size += 1
+        self._retrace(path)
+        if self.alpha is not None:
+            # A new leaf deeper than log base 1/alpha of the size has
+            # an ancestor that is out of weight balance
+            self._maxSize = max(self._maxSize, self._size)
+            if len(path) > log(self._size, 1 / self.alpha):
+                self._rebuild_scapegoat(path)
+
+    def update(self, iterable):
+        """Adds the items of iterable to the tree. A batch that is
+        large relative to the tree is merged with it in order and the
+        whole tree is rebuilt in O(n + k); a smaller one is added
+        median first, so that it does not skew the tree's shape."""
+        batch = self._sorted_items(iterable)
+        if not batch:
+            return
+        if len(batch) * log(len(self) + 2, 2) >= len(self):
+            items = list(merge(self.inorder(), batch))
+            self._root = _build_balanced(items, 0, len(items))
+            self._size = self._maxSize = len(items)
+        else:
+            for item in _balanced_order(batch):
+                self.add(item)
 
     def remove(self, item):
         """Precondition: item is in self.
         Raises: KeyError if item is not in self.
         postcondition: item is removed from self."""
-        if not item in self:
-            raise KeyError("Item not in tree.""")
-
-        # Helper function to adjust placement of an item
-        def liftMaxInLeftSubtreeToTop(top):
-            # Replace top's datum with the maximum datum in the left subtree
-            # Pre:  top has a left child
-            # Post: the maximum node in top's left subtree
-            #       has been removed
-            # Post: top.data = maximum value in top's left subtree
-            parent = top
-            currentNode = top.left
-            while not currentNode.right == None:
-                parent = currentNode
-                currentNode = currentNode.right
-            top.data = currentNode.data
-            if parent == top:
-                top.left = currentNode.left
-            else:
-                parent.right = currentNode.left
-
-        # Begin main part of the method
-        if self.isEmpty():
-            return None
-
-        # Attempt to locate the node containing the item
-        itemRemoved = None
-        preRoot = BSTNode(None)
-        preRoot.left = self._root
-        parent = preRoot
-        direction = 'L'
-        currentNode = self._root
-        while not currentNode == None:
-            if currentNode.data == item:
-                itemRemoved = currentNode.data
-                break
-            parent = currentNode
-            if currentNode.data > item:
-                direction = 'L'
-                currentNode = currentNode.left
+        # Attempt to locate the node containing the item, keeping
+        # the path that leads to it
+        path = []
+        node = self._root
+        while node is not None and node.data != item:
+            path.append(node)
+            if item < node.data:
+                node = node.left
             else:
-                direction = 'R'
-                currentNode = currentNode.right
-
-        # Return None if the item is absent
-        if itemRemoved == None:
-            return None
-
-        # The item is present, so remove its node
+                node = node.right
+        if node is None:
+            raise KeyError("Item not in tree.")
+        itemRemoved = node.data
 
         # Case 1: The node has a left and a right child
         #         Replace the node's value with the maximum value in the
-        #         left subtree
-        #         Delete the maximium node in the left subtree
-        if not currentNode.left == None \
-                and not currentNode.right == None:
-            liftMaxInLeftSubtreeToTop(currentNode)
+        #         left subtree, then unlink that node instead
+        if node.left is not None and node.right is not None:
+            top = node
+            path.append(top)
+            node = top.left
+            while node.right is not None:
+                path.append(node)
+                node = node.right
+            top.data = node.data
+
+        # Case 2 & 3: The node has at most one child, so tie its
+        #             parent to that child
+        newChild = node.left if node.right is None else node.right
+        if not path:
+            self._root = newChild
+        elif path[-1].left is node:
+            path[-1].left = newChild
         else:
-
-            # Case 2: The node has no left child
-            if currentNode.left == None:
-                newChild = currentNode.right
-
-                # Case 3: The node has no right child
-            else:
-                newChild = currentNode.left
-
-                # Case 2 & 3: Tie the parent to the new child
-            if direction == 'L':
-                parent.left = newChild
-            else:
-                parent.right = newChild
-
-        # All cases: Reset the root (if it hasn't changed no harm done)
-        #            Decrement the collection's size counter
-        #            Return the item
+            path[-1].right = newChild
         self._size -= 1
-        if self.isEmpty():
-            self._root = None
-        else:
-            self._root = preRoot.left
+        self._retrace(path)
+        if self.alpha is not None and self._size < self.alpha * self._maxSize:
+            self.rebalance()
         return itemRemoved
 
+    def _retrace(self, path):
+        """Recomputes the height and the size of the nodes on path,
+        from the deepest one up to the root, after a change below
+        the last of them."""
+        for node in reversed(path):
+            _refresh(node)
+
+    def _rebuild_scapegoat(self, path):
+        """Rebuilds the deepest subtree on path that is no longer
+        alpha-weight-balanced, then refreshes the heights above it."""
+        for index in range(len(path) - 1, -1, -1):
+            node = path[index]
+            limit = self.alpha * node.size
+            if (node.left is not None and node.left.size > limit) or \
+                    (node.right is not None and node.right.size > limit):
+                break
+        else:
+            return
+        nodes = _inorder_nodes(node)
+        newTop = _build_balanced(nodes, 0, len(nodes), True)
+        if index == 0:
+            self._root = newTop
+        elif path[index - 1].left is node:
+            path[index - 1].left = newTop
+        else:
+            path[index - 1].right = newTop
+        for node in reversed(path[:index]):
+            _refresh(node)
+
     def replace(self, item, newItem):
         """
         If item is in self, replaces it with newItem and
@@ -227,37 +465,12 @@ class LinkedBST(AbstractCollection):
 
     def height(self):
         '''
-        Return the height of tree
+        Return the height of tree in O(1), from the height kept
+        in its root
         :return: int
         '''
-        leaves = []
-        for node in self:
-            if self.is_leaf(node):
-                leaves.append(node)
-
-        def height1(top):
-            '''
-            Helper function
-            :param top:
-            :return:
-            Переробити нормально
-            '''
-            cur_comp = self._root
-            height = 0
-            while cur_comp.data != top.data:
-                if top.data < cur_comp.data:
-                    cur_comp = cur_comp.left
-                    height += 1
-                else:
-                    cur_comp = cur_comp.right
-                    height += 1
-            return height
-
-        height = 0
-        for leaf in leaves:
-            height = max(height, height1(leaf))
-
-        return height
+        root = self._root
+        return 0 if root is None else root.height
 
     @staticmethod
     def is_leaf(node):
@@ -265,39 +478,142 @@ class LinkedBST(AbstractCollection):
 
     def is_balanced(self):
         '''
-        Return True if tree is balanced
+        Return True if tree is balanced, in O(1) from the height
+        and size kept in its root
         :return:
         '''
-        return True if self.height() < 2*log(self._size+1, 2)-1 else False
+        root = self._root
+        if root is None:
+            return False
+        return True if root.height < 2*log(root.size+1, 2)-1 else False
+
+    def search_depth(self, item):
+        '''
+        Return the number of nodes that find visits when it
+        looks for item, whether or not item is present.
+        :param item:
+        :return: int
+        '''
+        depth = 0
+        node = self._root
+        while node is not None:
+            depth += 1
+            if item == node.data:
+                break
+            elif item < node.data:
+                node = node.left
+            else:
+                node = node.right
+        return depth
 
     def range_find(self, low, high):
         '''
-        Returns a list of the items in the tree, where low <= item <= high."""
+        Yields the items in the tree, where low <= item <= high,
+        in sorted order. Subtrees that lie outside the range are
+        never visited, so the cost is O(height + k).
         :param low:
         :param high:
         :return:
         '''
-        range_items = [node.data for node in self if (
-            low <= node.data <= high)]
-        return range_items
+        stack = []
+        node = self._root
+        while node is not None or stack:
+            if node is not None:
+                if node.data < low:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            else:
+                node = stack.pop()
+                if high < node.data:
+                    return
+                yield node.data
+                node = node.right
+
+    def prefix_find(self, prefix, limit=None):
+        '''
+        Yields the items in the tree that start with prefix, in
+        sorted order, at most limit of them if limit is given. The
+        walk descends to the first match and stops at the first item
+        past the matches, so the cost is O(height + k).
+        Precondition: the items are strings.
+        :param prefix:
+        :param limit:
+        :return:
+        '''
+        if limit is not None and limit <= 0:
+            return
+        count = 0
+        stack = []
+        node = self._root
+        while node is not None or stack:
+            if node is not None:
+                if node.data < prefix:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            else:
+                node = stack.pop()
+                if not node.data.startswith(prefix):
+                    return
+                yield node.data
+                count += 1
+                if count == limit:
+                    return
+                node = node.right
+
+    def count_prefix(self, prefix):
+        """
+        Returns the number of items in the tree that start with
+        prefix, in O(height) and without visiting them.
+        Precondition: the items are strings.
+        :param prefix:
+        :return: int
+        """
+        root = self._root
+        bound = prefix_bound(prefix)
+        above = _size(root) if bound is None else _count_below(root, bound)
+        return above - _count_below(root, prefix)
 
     def rebalance(self):
         '''
-        Rebalances the tree.
+        Rebalances the tree in O(n) by linking its items, in order,
+        into a perfectly balanced shape.
         :return:
         '''
-        elements = [node.data for node in self]
-        elements.sort(key=lambda x: x)
-        self.clear()
-
-        def recurse(nodes: list):
-            if len(nodes) == 0:
-                return None
-            middle = len(nodes)//2
-            self.add(nodes.pop(middle))
-            recurse(nodes[:middle])
-            recurse(nodes[middle:])
-        recurse(elements)
+        elements = list(self.inorder())
+        self._root = _build_balanced(elements, 0, len(elements))
+        self._maxSize = self._size
+
+    def save(self, path):
+        """
+        Writes the items of self, which must be strings, to a
+        binary snapshot file at path.
+        :param path:
+        :return:
+        """
+        write_snapshot(path, self.inorder())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Returns a new, balanced tree holding the items of the
+        snapshot file at path, built in O(n).
+        :param path:
+        :return:
+        """
+        return cls.from_sorted(read_snapshot(path))
+
+    def freeze(self):
+        """
+        Returns a read-only FrozenBST snapshot of the items in self,
+        stored as one sorted list for bisect lookups.
+        :return: FrozenBST
+        """
+        from frozenbst import FrozenBST
+        return FrozenBST(self.inorder())
 
     def successor(self, item):
         """
@@ -308,12 +624,15 @@ class LinkedBST(AbstractCollection):
         :return:
         :rtype:
         """
-        tree_cp = [node.data for node in self]
-        try:
-            successor = min([val for val in tree_cp if val > item])
-            return successor
-        except ValueError:
-            pass
+        successor = None
+        node = self._root
+        while node is not None:
+            if item < node.data:
+                successor = node.data
+                node = node.left
+            else:
+                node = node.right
+        return successor
 
     def predecessor(self, item):
         """
@@ -324,114 +643,70 @@ class LinkedBST(AbstractCollection):
         :return:
         :rtype:
         """
-        tree_cp = [node.data for node in self]
-        try:
-            preccessor = max([val for val in tree_cp if val < item])
-            return preccessor
-        except ValueError:
-            pass
-
-    @staticmethod
-    def get_vocabulary(path: str) -> tuple[list]:
-        with open(path, "r") as file:
-            vocabulary = [line[:-1] for line in file]
-        random_10000 = random.sample(vocabulary, 10000)
-        return vocabulary, random_10000
-
-    @staticmethod
-    def find_list(voc: list, to_find: list) -> float:
-        """Return time to find words in a list.
-
-        Args:
-            voc (list): Full vocabulary.
-            to_find (list): Words to find.
+        predecessor = None
+        node = self._root
+        while node is not None:
+            if node.data < item:
+                predecessor = node.data
+                node = node.right
+            else:
+                node = node.left
+        return predecessor
 
-        Returns:
-            float: Time taken in seconds.
+    def rank(self, item):
         """
-        start = perf_counter()
-        for word in to_find:
-            voc.index(word)
-        end = perf_counter()
-        return end-start
-
-    def find_tree1(self, voc: list, to_find: list) -> float:
-        """Return time to find words in alphabetic tree.
-
-        Args:
-            voc (list): Full vocabulary.
-            to_find (list): Words to find.
+        Returns the number of items in the tree that are
+        smaller than item.
+        :param item:
+        :return: int
+        """
+        return _count_below(self._root, item)
 
-        Returns:
-            float: Time taken in minutes..
+    def select(self, k):
+        """
+        Returns the k-th smallest item, counting from 0.
+        Raises: IndexError if k is out of range.
+        :param k:
+        :return:
         """
-        for word in voc:
-            self.add(word)
-        start = perf_counter()
-        for word in to_find:
-            self.find(word)
-        end = perf_counter()
-        self.clear()
-        return (end-start)/60
-
-    def find_tree2(self, voc: list, to_find: list) -> float:
-        """Return  time to find words in random tree.
-
-        Args:
-            voc (list): Full vocabulary.
-            to_find (list): Words to find.
-
-        Returns:
-            float: Time taken in seconds.
+        return _select(self._root, k)
+
+    def count_range(self, low, high):
         """
-        random.shuffle(voc)
-        for word in voc:
-            self.add(word)
-        start = perf_counter()
-        for word in to_find:
-            self.find(word)
-        end = perf_counter()
-        return end-start
-
-    def find_tree3(self, to_find: list) -> float:
-        """Return time to find words in balanced tree.
-
-        Args:
-            to_find (list): Words to find.
-
-        Returns:
-            float: Time taken in seconds.
+        Returns the number of items in the tree, where
+        low <= item <= high, without visiting them.
+        :param low:
+        :param high:
+        :return: int
         """
-        self.rebalance()
-        start = perf_counter()
-        for word in to_find:
-            self.find(word)
-        end = perf_counter()
-        return end-start
-
-    def demo_bst(self, path):
+        if high < low:
+            return 0
+        root = self._root
+        return _count_below(root, high, True) - _count_below(root, low)
+
+    def median(self):
         """
-        Demonstration of efficiency binary search tree for the search tasks.
-        :param path:
-        :type path:
+        Returns the lower median of the items in the tree.
+        Raises: IndexError if the tree is empty.
         :return:
-        :rtype:
         """
-        vocabulary, to_find = self.get_vocabulary(path)
+        root = self._root
+        return _select(root, (_size(root) - 1) // 2)
 
-        taken1 = self.find_list(vocabulary, to_find)
-        print(f"Time to find in list: {taken1} sec.")
-       
-        taken2 = self.find_tree1(vocabulary, to_find)
-        print(f"Time to find in alpahbetic tree: {taken2} min.")
-
-        taken3 = self.find_tree2(vocabulary, to_find)
-        print(f"Time to find in random tree: {taken3} sec.")
-        
-        taken4 = self.find_tree3(to_find)
-        print(f"Time to find in balanced tree: {taken4} sec.")
+    def percentile(self, p):
+        """
+        Returns the item at the p-th percentile, 0 <= p <= 100,
+        by the nearest-rank method.
+        Raises: IndexError if the tree is empty.
+        :param p:
+        :return:
+        """
+        if not 0 <= p <= 100:
+            raise ValueError("Percentile must be between 0 and 100.")
+        root = self._root
+        return _select(root, max(0, ceil(p * _size(root) / 100) - 1))
 
 
 if __name__ == "__main__":
-    tree = LinkedBST()
-    tree.demo_bst("words.txt")
+    from benchmark import main
+    main()
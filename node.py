@@ -6,6 +6,8 @@ Author: Ken Lambert
 class Node(object):
     """Represents a singly linked node."""
 
+    __slots__ = ("data", "next")
+
     def __init__(self, data, next = None):
         self.data = data
         self.next = next
@@ -0,0 +1,98 @@
+"""
+File: parallelquery.py
+
+Batched lookups spread over a pool of worker processes, each of
+which searches the same snapshot file through its own memory map.
+The operating system shares the mapped pages between the workers,
+so attaching a worker neither copies nor rebuilds the index.
+"""
+
+import os
+from multiprocessing import Pool
+from frozenbst import FrozenBST
+
+# The index opened by the initializer of each worker process
+_index = None
+
+
+def _attach(path):
+    """Maps the snapshot file at path into this worker."""
+    global _index
+    _index = FrozenBST.load(path)
+
+
+def _find_chunk(items):
+    return _index.find_many(items)
+
+
+def _range_chunk(bounds):
+    return [list(_index.range_find(low, high)) for low, high in bounds]
+
+
+def _count_chunk(bounds):
+    return [_index.count_range(low, high) for low, high in bounds]
+
+
+class ParallelIndex(object):
+    """Answers batches of find, range and count queries against a
+    snapshot file, such as one written by LinkedBST.save, by splitting
+    each batch into contiguous chunks and searching them in parallel.
+    Results come back in the order of the batch."""
+
+    def __init__(self, path, processes=None, chunksPerProcess=4):
+        """Starts processes workers, by default one per CPU, each
+        attached to the snapshot file at path."""
+        self.processes = processes or os.cpu_count() or 1
+        self.chunksPerProcess = chunksPerProcess
+        self._pool = Pool(self.processes, _attach, (path,))
+
+    @classmethod
+    def from_tree(cls, tree, path, processes=None):
+        """Saves tree as a snapshot file at path and returns an index
+        over it."""
+        tree.save(path)
+        return cls(path, processes)
+
+    def _map(self, function, batch):
+        """Applies function to contiguous chunks of batch in the
+        workers and returns the joined results."""
+        batch = list(batch)
+        chunks = self.processes * self.chunksPerProcess
+        step = max(1, -(-len(batch) // chunks))
+        parts = [batch[start:start + step]
+                 for start in range(0, len(batch), step)]
+        results = []
+        for part in self._pool.map(function, parts):
+            results.extend(part)
+        return results
+
+    def find_many(self, items):
+        """Returns a list holding, for each of items in turn, the
+        matched item in the index or None."""
+        return self._map(_find_chunk, items)
+
+    def contains_many(self, items):
+        """Returns a list of booleans telling, for each of items in
+        turn, whether it is in the index."""
+        return [result is not None for result in self.find_many(items)]
+
+    def range_find_many(self, bounds):
+        """Returns, for each (low, high) pair of bounds in turn, the
+        list of items where low <= item <= high."""
+        return self._map(_range_chunk, bounds)
+
+    def count_range_many(self, bounds):
+        """Returns, for each (low, high) pair of bounds in turn, the
+        number of items where low <= item <= high."""
+        return self._map(_count_chunk, bounds)
+
+    def close(self):
+        """Stops the workers. The index cannot be used afterwards."""
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excInfo):
+        self.close()
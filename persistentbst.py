@@ -0,0 +1,156 @@
+"""
+File: persistentbst.py
+
+A persistent linked binary search tree: every update returns a new
+version of the tree and leaves the old one as it was.
+"""
+
+from heapq import merge
+from math import log
+from bstnode import BSTNode
+from linkedbst import LinkedBST, _balanced_order, _build_balanced
+
+
+def _copy_path(path, child):
+    """Returns the root of fresh copies of the nodes on path, each
+    linked to the copy below it, with child in place of the subtree
+    the last of them led to. Each path entry holds a node, True if
+    the path went left from it, and the data for its copy."""
+    for node, wentLeft, data in reversed(path):
+        if wentLeft:
+            child = BSTNode(data, child, node.right)
+        else:
+            child = BSTNode(data, node.left, child)
+    return child
+
+
+def copy_insert(root, item):
+    """Returns the root of a tree that holds the items under root and
+    item, sharing every node that is not on item's search path."""
+    path = []
+    node = root
+    while node is not None:
+        wentLeft = item < node.data
+        path.append((node, wentLeft, node.data))
+        node = node.left if wentLeft else node.right
+    return _copy_path(path, BSTNode(item))
+
+
+def copy_remove(root, item):
+    """Returns the root of a tree that holds the items under root
+    except item, and the removed item, sharing every node that is not
+    on the path to the node that is unlinked.
+    Raises: KeyError if item is not under root."""
+    path = []
+    node = root
+    while node is not None and node.data != item:
+        wentLeft = item < node.data
+        path.append((node, wentLeft, node.data))
+        node = node.left if wentLeft else node.right
+    if node is None:
+        raise KeyError("Item not in tree.")
+    itemRemoved = node.data
+
+    if node.left is not None and node.right is not None:
+        # The copy of the node takes the maximum value in its left
+        # subtree, and the node holding that value is unlinked
+        top = len(path)
+        path.append((node, True, None))
+        node = node.left
+        while node.right is not None:
+            path.append((node, False, node.data))
+            node = node.right
+        path[top] = (path[top][0], True, node.data)
+
+    newChild = node.left if node.right is None else node.right
+    return _copy_path(path, newChild), itemRemoved
+
+
+def copy_replace(root, item, newItem):
+    """Returns the root of a tree in which the node matching item
+    holds newItem, and the old item, or root and None if item is
+    not under root."""
+    path = []
+    node = root
+    while node is not None and node.data != item:
+        wentLeft = item < node.data
+        path.append((node, wentLeft, node.data))
+        node = node.left if wentLeft else node.right
+    if node is None:
+        return root, None
+    copy = BSTNode(newItem, node.left, node.right)
+    return _copy_path(path, copy), node.data
+
+
+class PersistentBST(LinkedBST):
+    """A link-based binary search tree whose versions never change.
+    add, remove, replace, update, clear and rebalance return a new
+    version and leave self as it was. A new version shares every node
+    that is not on the path the update changed, so an update allocates
+    O(log n) nodes in a balanced tree, and keeping a version around,
+    as a snapshot, costs O(1)."""
+
+    def __init__(self, sourceCollection=None):
+        """Sets the initial state of self, which includes the
+        contents of sourceCollection, if it's present."""
+        LinkedBST.__init__(self)
+        if sourceCollection:
+            items = self._sorted_items(sourceCollection)
+            self._root = _build_balanced(items, 0, len(items))
+
+    @classmethod
+    def from_root(cls, root):
+        """Returns a version holding the tree under root, which must
+        never be changed in place afterwards."""
+        tree = cls()
+        tree._root = root
+        return tree
+
+    # Accessor methods
+    def __len__(self):
+        """Returns the number of items in self."""
+        return 0 if self._root is None else self._root.size
+
+    def snapshot(self):
+        """Returns self, which never changes."""
+        return self
+
+    # Versioning methods
+    def clear(self):
+        """Returns an empty version."""
+        return type(self)()
+
+    def add(self, item):
+        """Returns a version that also holds item."""
+        return self.from_root(copy_insert(self._root, item))
+
+    def update(self, iterable):
+        """Returns a version that also holds the items of iterable.
+        As in LinkedBST.update, a batch that is large relative to the
+        tree is merged with it into fresh nodes in O(n + k); a smaller
+        one is added median first, copying one path per item."""
+        batch = self._sorted_items(iterable)
+        if not batch:
+            return self
+        if len(batch) * log(len(self) + 2, 2) >= len(self):
+            return type(self).from_sorted(merge(self.inorder(), batch))
+        root = self._root
+        for item in _balanced_order(batch):
+            root = copy_insert(root, item)
+        return self.from_root(root)
+
+    def remove(self, item):
+        """Returns a version without item.
+        Raises: KeyError if item is not in self."""
+        return self.from_root(copy_remove(self._root, item)[0])
+
+    def replace(self, item, newItem):
+        """Returns a version in which newItem takes the place of
+        item, or self if item is not in self."""
+        root, oldItem = copy_replace(self._root, item, newItem)
+        return self if oldItem is None else self.from_root(root)
+
+    def rebalance(self):
+        """Returns a perfectly balanced version, built in O(n) from
+        fresh nodes."""
+        return type(self).from_sorted(self.inorder())
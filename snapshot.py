@@ -0,0 +1,127 @@
+"""
+File: snapshot.py
+
+A compact binary snapshot format for string-keyed trees.
+
+Layout, all integers little-endian:
+    header   magic b"BST\\x00", uint32 version, uint64 count n
+    index    n + 1 uint64 byte offsets into the string table
+    table    the UTF-8 encoded items, in sorted order, back to back
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+MAGIC = b"BST\x00"
+VERSION = 1
+HEADER = struct.Struct("<4sIQ")
+
+
+def write_snapshot(path, sortedItems):
+    """Writes sortedItems, which must be strings in ascending order,
+    to a snapshot file at path."""
+    offsets = array("Q", [0])
+    table = bytearray()
+    for item in sortedItems:
+        if not isinstance(item, str):
+            raise TypeError("Only str items can be saved in a snapshot.")
+        table += item.encode("utf-8")
+        offsets.append(len(table))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(offsets) - 1))
+        file.write(offsets.tobytes())
+        file.write(table)
+
+
+def _parse(buffer):
+    """Checks the header of buffer and returns the count, the
+    offsets and the position where the string table starts."""
+    if len(buffer) < HEADER.size:
+        raise ValueError("Not a snapshot file.")
+    magic, version, count = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("Not a snapshot file.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}.")
+    tableStart = HEADER.size + 8 * (count + 1)
+    if sys.byteorder == "little":
+        offsets = memoryview(buffer)[HEADER.size:tableStart].cast("Q")
+    else:
+        offsets = array("Q", buffer[HEADER.size:tableStart])
+        offsets.byteswap()
+    return count, offsets, tableStart
+
+
+def read_snapshot(path):
+    """Returns the items of the snapshot file at path as a sorted
+    list of strings."""
+    with open(path, "rb") as file:
+        data = file.read()
+    count, offsets, tableStart = _parse(data)
+    table = data[tableStart:]
+    if table.isascii():
+        # Byte offsets are character offsets, so decode only once
+        text = table.decode("ascii")
+        items = [text[offsets[i]:offsets[i + 1]] for i in range(count)]
+    else:
+        items = [table[offsets[i]:offsets[i + 1]].decode("utf-8")
+                 for i in range(count)]
+    if isinstance(offsets, memoryview):
+        offsets.release()
+    return items
+
+
+class SnapshotView(Sequence):
+    """A sorted, read-only sequence over the items of a snapshot held
+    in a buffer, such as a memory-mapped file. Items are decoded from
+    the buffer when they are compared or returned, so opening a view
+    costs O(1) whatever the size of the snapshot."""
+
+    def __init__(self, buffer):
+        """Sets the initial state of self to view the snapshot
+        in buffer."""
+        self._buffer = buffer
+        self._count, self._offsets, self._tableStart = _parse(buffer)
+
+    @classmethod
+    def open(cls, path):
+        """Returns a view of the snapshot file at path, mapped
+        into memory rather than read."""
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def __len__(self):
+        """Returns the number of items in self."""
+        return self._count
+
+    def __getitem__(self, index):
+        """Returns the item at index, decoded on demand."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Snapshot index out of range.")
+        start = self._tableStart + self._offsets[index]
+        stop = self._tableStart + self._offsets[index + 1]
+        return str(self._buffer[start:stop], "utf-8")
+
+    def close(self):
+        """Releases the buffer if self mapped it. The view cannot be
+        used afterwards."""
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excInfo):
+        self.close()
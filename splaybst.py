@@ -0,0 +1,158 @@
+"""
+File: splaybst.py
+
+A self-adjusting (splay) variant of the linked binary search tree.
+"""
+
+from bstnode import BSTNode
+from linkedbst import LinkedBST, _refresh
+
+
+def _splay(path):
+    """Rotates the last node on path up to the place of the first and
+    returns it. Each entry of path is a child of the one before it.
+    The rotations are written out, two levels at a time, for speed."""
+    index = len(path) - 1
+    node = path[index]
+    while index > 1:
+        parent = path[index - 1]
+        grand = path[index - 2]
+        if grand.left is parent:
+            if parent.left is node:
+                # Zig-zig
+                grand.left = parent.right
+                parent.right = grand
+                parent.left = node.right
+                node.right = parent
+                _refresh(grand)
+                _refresh(parent)
+            else:
+                # Zig-zag
+                grand.left = node.right
+                parent.right = node.left
+                node.left = parent
+                node.right = grand
+                _refresh(parent)
+                _refresh(grand)
+        elif parent.right is node:
+            grand.right = parent.left
+            parent.left = grand
+            parent.right = node.left
+            node.left = parent
+            _refresh(grand)
+            _refresh(parent)
+        else:
+            grand.right = node.left
+            parent.left = node.right
+            node.right = parent
+            node.left = grand
+            _refresh(parent)
+            _refresh(grand)
+        _refresh(node)
+        index -= 2
+        if index > 0:
+            above = path[index - 1]
+            if above.left is grand:
+                above.left = node
+            else:
+                above.right = node
+    if index == 1:
+        # Zig: one level is left, so rotate node over the top
+        parent = path[0]
+        if parent.left is node:
+            parent.left = node.right
+            node.right = parent
+        else:
+            parent.right = node.left
+            node.left = parent
+        _refresh(parent)
+        _refresh(node)
+    return node
+
+
+class SplayBST(LinkedBST):
+    """A link-based binary search tree that rotates every node that
+    find, add or remove reaches up to the root. Recently used items
+    therefore sit near the top, and any sequence of operations costs
+    amortised O(log n) each. Since find changes the shape of the tree,
+    even lookups must not run concurrently with each other."""
+
+    def __init__(self, sourceCollection=None):
+        """Sets the initial state of self, which includes the
+        contents of sourceCollection, if it's present."""
+        LinkedBST.__init__(self, sourceCollection)
+
+    def _search(self, item):
+        """Returns the path from the root to the node holding item,
+        or to the last node visited if item is not in self."""
+        path = []
+        node = self._root
+        while node is not None:
+            path.append(node)
+            if item == node.data:
+                break
+            elif item < node.data:
+                node = node.left
+            else:
+                node = node.right
+        return path
+
+    # Accessor methods
+    def find(self, item):
+        """If item matches an item in self, returns the
+        matched item, or None otherwise. The last node visited
+        is splayed to the root."""
+        path = self._search(item)
+        if not path:
+            return None
+        self._root = _splay(path)
+        return self._root.data if self._root.data == item else None
+
+    # Mutator methods
+    def add(self, item):
+        """Adds item to the tree and splays it to the root."""
+        path = []
+        node = self._root
+        while node is not None:
+            path.append(node)
+            if item < node.data:
+                node = node.left
+            else:
+                node = node.right
+        node = BSTNode(item)
+        if not path:
+            self._root = node
+        else:
+            if item < path[-1].data:
+                path[-1].left = node
+            else:
+                path[-1].right = node
+            path.append(node)
+            self._root = _splay(path)
+        self._size += 1
+
+    def remove(self, item):
+        """Precondition: item is in self.
+        Raises: KeyError if item is not in self.
+        postcondition: item is removed from self."""
+        path = self._search(item)
+        if not path:
+            raise KeyError("Item not in tree.")
+        top = self._root = _splay(path)
+        if top.data != item:
+            raise KeyError("Item not in tree.")
+
+        # Splay the maximum of the left subtree to its top, where it
+        # has no right child, and hang the right subtree there
+        if top.left is None:
+            self._root = top.right
+        else:
+            path = [top.left]
+            while path[-1].right is not None:
+                path.append(path[-1].right)
+            newTop = _splay(path)
+            newTop.right = top.right
+            _refresh(newTop)
+            self._root = newTop
+        self._size -= 1
+        return top.data
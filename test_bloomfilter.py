@@ -0,0 +1,71 @@
+"""
+File: test_bloomfilter.py
+
+Checks the false positive rate of BloomFilter and that
+BloomFilteredBST answers lookups exactly like the tree it wraps.
+"""
+
+import random
+import unittest
+
+from avlbst import AVLBST
+from bloomfilter import BloomFilter, BloomFilteredBST
+
+
+class BloomFilterTest(unittest.TestCase):
+
+    def false_positive_rate(self, present, absent, errorRate):
+        bloom = BloomFilter(len(present), errorRate)
+        for item in present:
+            bloom.add(item)
+        for item in present:
+            self.assertIn(item, bloom)
+        return sum(item in bloom for item in absent) / len(absent)
+
+    def test_int_keys_meet_error_rate(self):
+        for errorRate in (0.01, 0.05):
+            rate = self.false_positive_rate(range(1000), range(1000, 51000),
+                                            errorRate)
+            self.assertLess(rate, 2 * errorRate)
+
+    def test_float_keys_meet_error_rate(self):
+        rate = self.false_positive_rate([float(i) for i in range(1000)],
+                                        [float(i) for i in range(1000, 21000)],
+                                        0.01)
+        self.assertLess(rate, 0.02)
+
+    def test_str_keys_meet_error_rate(self):
+        rate = self.false_positive_rate(
+            ["word%d" % i for i in range(1000)],
+            ["word%d" % i for i in range(1000, 21000)], 0.01)
+        self.assertLess(rate, 0.02)
+
+
+class BloomFilteredBSTTest(unittest.TestCase):
+
+    def test_lookups_match_the_tree_through_updates(self):
+        rng = random.Random(0)
+        tree = BloomFilteredBST(AVLBST(), 0.05)
+        expected = set()
+        for _ in range(5000):
+            item = rng.randrange(3000)
+            choice = rng.random()
+            if choice < 0.3 and expected:
+                victim = min(expected)
+                tree.remove(victim)
+                expected.discard(victim)
+            elif choice < 0.6 and item not in expected:
+                tree.add(item)
+                expected.add(item)
+            elif choice < 0.61:
+                tree.rebalance()
+            else:
+                self.assertEqual(item in tree, item in expected)
+        probes = list(range(-5, 3005))
+        self.assertEqual(tree.contains_many(probes),
+                         [item in expected for item in probes])
+        self.assertEqual(len(tree), len(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
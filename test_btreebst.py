@@ -0,0 +1,140 @@
+"""
+File: test_btreebst.py
+
+Stress tests for BTreeBST: random adds and removes, duplicates
+included, with the B+ tree invariants checked after every step.
+"""
+
+import random
+import unittest
+from bisect import bisect_left, insort
+
+from btreebst import BTreeBST
+
+
+def check_invariants(tree):
+    """Checks that every leaf of tree is at the same depth, that keys
+    are sorted and lie within the separators above them, that every
+    node but the root holds between order // 2 and order keys, that
+    item counts are right, and that the leaf chain links the leaves
+    from left to right."""
+    leaves = []
+    depths = set()
+
+    def walk(node, low, high, depth, isRoot):
+        keys = node.keys
+        assert keys == sorted(keys)
+        assert len(keys) <= tree.order
+        assert isRoot or len(keys) >= tree.order // 2
+        assert low is None or all(low <= key for key in keys)
+        assert high is None or all(key <= high for key in keys)
+        if node.children is None:
+            leaves.append(node)
+            depths.add(depth)
+            return len(keys)
+        assert len(node.children) == len(keys) + 1
+        assert len(keys) >= 1
+        count = 0
+        for index, child in enumerate(node.children):
+            count += walk(child, keys[index - 1] if index > 0 else low,
+                          keys[index] if index < len(keys) else high,
+                          depth + 1, False)
+        assert node.size == count
+        return count
+
+    count = walk(tree._root, None, None, 0, True)
+    assert count == len(tree)
+    assert len(depths) == 1
+    for leaf, following in zip(leaves, leaves[1:]):
+        assert leaf.next is following
+    assert leaves[-1].next is None
+
+
+class BTreeBSTTest(unittest.TestCase):
+
+    def run_random_updates(self, tree, expected, rng, steps, keys):
+        for _ in range(steps):
+            item = rng.randrange(keys)
+            choice = rng.random()
+            if choice < 0.4 and expected:
+                victim = rng.choice(expected)
+                self.assertEqual(tree.remove(victim), victim)
+                expected.remove(victim)
+            elif choice < 0.45:
+                with self.assertRaises(KeyError):
+                    tree.remove(item + 0.5)
+            else:
+                tree.add(item)
+                insort(expected, item)
+            check_invariants(tree)
+            self.assertEqual(list(tree.inorder()), expected)
+
+    def test_random_updates_keep_invariants(self):
+        rng = random.Random(0)
+        for order in range(4, 9):
+            for _ in range(20):
+                tree = BTreeBST(order=order)
+                expected = []
+                # Few distinct keys, so that duplicates span splits
+                self.run_random_updates(tree, expected, rng, 300, 40)
+
+    def test_updates_after_bulk_load_keep_invariants(self):
+        rng = random.Random(1)
+        for order in range(4, 9):
+            for size in (0, 1, order, order + 1, 5 * order, 100):
+                expected = sorted(rng.choices(range(60), k=size))
+                tree = BTreeBST.from_sorted(expected, order)
+                check_invariants(tree)
+                self.run_random_updates(tree, expected, rng, 200, 60)
+
+    def test_bulk_load_fills_every_node(self):
+        for order in range(4, 9):
+            for size in range(300):
+                check_invariants(BTreeBST.from_sorted(range(size), order))
+
+    def test_removing_everything_empties_the_tree(self):
+        rng = random.Random(2)
+        items = [rng.randrange(20) for _ in range(300)]
+        tree = BTreeBST(items, order=4)
+        rng.shuffle(items)
+        for item in items:
+            tree.remove(item)
+            check_invariants(tree)
+        self.assertTrue(tree.isEmpty())
+        self.assertIsNone(tree._root.children)
+
+    def test_queries_match_sorted_list(self):
+        rng = random.Random(3)
+        expected = sorted(rng.choices(range(200), k=500))
+        tree = BTreeBST(order=5)
+        for item in rng.sample(expected, len(expected)):
+            tree.add(item)
+        probes = list(range(-2, 203))
+        self.assertEqual(tree.find_many(probes),
+                         [item if item in expected else None
+                          for item in probes])
+        for item in probes:
+            self.assertEqual(tree.rank(item), bisect_left(expected, item))
+            self.assertEqual(tree.count_range(item, item + 10),
+                             sum(item <= x <= item + 10 for x in expected))
+            larger = [x for x in expected if x > item]
+            smaller = [x for x in expected if x < item]
+            self.assertEqual(tree.successor(item),
+                             larger[0] if larger else None)
+            self.assertEqual(tree.predecessor(item),
+                             smaller[-1] if smaller else None)
+        for k in range(-len(expected), len(expected)):
+            self.assertEqual(tree.select(k), expected[k])
+
+    def test_prefix_queries(self):
+        words = sorted(["a", "ab", "abc", "abd", "b", "ba", "bab", "c"] * 3)
+        tree = BTreeBST(words, order=4)
+        for prefix in ("", "a", "ab", "abc", "b", "ba", "c", "d"):
+            matches = [word for word in words if word.startswith(prefix)]
+            self.assertEqual(list(tree.prefix_find(prefix)), matches)
+            self.assertEqual(list(tree.prefix_find(prefix, 2)), matches[:2])
+            self.assertEqual(tree.count_prefix(prefix), len(matches))
+
+
+if __name__ == "__main__":
+    unittest.main()
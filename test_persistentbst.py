@@ -0,0 +1,94 @@
+"""
+File: test_persistentbst.py
+
+Checks that persistent versions and concurrent snapshots share nodes
+without changing, and answer queries like a plain tree.
+"""
+
+import random
+import unittest
+
+from concurrentbst import ConcurrentBST
+from linkedbst import LinkedBST
+from persistentbst import PersistentBST
+
+
+def check_node_fields(node):
+    """Returns the height and the size of the subtree rooted at node,
+    checking that every node there records them correctly."""
+    if node is None:
+        return -1, 0
+    leftHeight, leftSize = check_node_fields(node.left)
+    rightHeight, rightSize = check_node_fields(node.right)
+    assert node.height == 1 + max(leftHeight, rightHeight)
+    assert node.size == 1 + leftSize + rightSize
+    return node.height, node.size
+
+
+class PersistentBSTTest(unittest.TestCase):
+
+    def test_versions_are_unchanged_by_later_updates(self):
+        rng = random.Random(0)
+        version = PersistentBST(rng.sample(range(200), 50))
+        history = [(version, sorted(version.inorder()))]
+        for _ in range(300):
+            expected = list(history[-1][1])
+            if expected and rng.random() < 0.4:
+                item = rng.choice(expected)
+                version = version.remove(item)
+                expected.remove(item)
+            else:
+                item = rng.randrange(250)
+                version = version.add(item)
+                expected = sorted(expected + [item])
+            check_node_fields(version._root)
+            history.append((version, expected))
+        for version, expected in history:
+            self.assertEqual(list(version.inorder()), expected)
+            self.assertEqual(len(version), len(expected))
+
+    def test_update_shares_untouched_nodes(self):
+        old = PersistentBST(range(1000))
+        new = old.add(500.5)
+        oldNodes = set(map(id, old._preorder_nodes()))
+        newNodes = set(map(id, new._preorder_nodes()))
+        self.assertLessEqual(len(newNodes - oldNodes), new.height() + 1)
+
+    def test_remove_missing_item_raises(self):
+        with self.assertRaises(KeyError):
+            PersistentBST([1, 2]).remove(3)
+
+    def test_len_and_balance_match_plain_tree(self):
+        for items in ([], [1], list(range(100)), list(range(1000))):
+            plain = LinkedBST.from_sorted(items)
+            version = PersistentBST(items)
+            self.assertEqual(len(version), len(plain))
+            self.assertEqual(version.is_balanced(), plain.is_balanced())
+        self.assertTrue(PersistentBST(range(100)).is_balanced())
+        self.assertTrue(PersistentBST().add(1).is_balanced())
+
+
+class ConcurrentSnapshotTest(unittest.TestCase):
+
+    def test_snapshot_is_fixed_in_time(self):
+        tree = ConcurrentBST(range(0, 100, 2))
+        snapshot = tree.snapshot()
+        for item in range(1, 100, 2):
+            tree.add(item)
+        for item in range(0, 100, 4):
+            tree.remove(item)
+        self.assertEqual(list(snapshot.inorder()), list(range(0, 100, 2)))
+        self.assertEqual(len(snapshot), 50)
+
+    def test_snapshot_len_and_balance_match_plain_tree(self):
+        items = list(range(500))
+        tree = ConcurrentBST(items)
+        plain = LinkedBST.from_sorted(items)
+        snapshot = tree.snapshot()
+        self.assertEqual(len(snapshot), len(plain))
+        self.assertEqual(snapshot.is_balanced(), plain.is_balanced())
+        self.assertTrue(snapshot.is_balanced())
+
+
+if __name__ == "__main__":
+    unittest.main()
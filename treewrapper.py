@@ -0,0 +1,30 @@
+"""
+File: treewrapper.py
+
+A base class for objects that wrap a search tree.
+"""
+
+
+class TreeWrapper(object):
+    """Wraps a tree so that a subclass can override some of its
+    methods, such as find or add. Every attribute the subclass does
+    not define is passed through to the tree."""
+
+    def __init__(self, tree):
+        """Sets the initial state of self to wrap tree."""
+        self._tree = tree
+
+    def __getattr__(self, name):
+        if name == "_tree":
+            # Not set yet, so do not look for it on the tree
+            raise AttributeError(name)
+        return getattr(self._tree, name)
+
+    def __len__(self):
+        return len(self._tree)
+
+    def __iter__(self):
+        return iter(self._tree)
+
+    def __str__(self):
+        return str(self._tree)
@@ -0,0 +1,110 @@
+"""
+File: vocabulary.py
+
+Memory-mapped readers for word lists such as words.txt, holding
+one word per line. iter_words streams the words straight into a
+bulk build, as in LinkedBST(iter_words(path)); MappedVocabulary
+keeps only their offsets, for use as FrozenBST(MappedVocabulary(path)).
+"""
+
+import mmap
+from array import array
+from collections.abc import Sequence
+
+CHUNK_SIZE = 1 << 20
+
+
+def _open_buffer(path):
+    """Returns a read-only memory map of the file at path, or an
+    empty bytes object if the file is empty."""
+    with open(path, "rb") as file:
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return b""
+
+
+def _chunks(buf):
+    """Yields (offset, chunk) pairs that split buf at line ends
+    into pieces of about CHUNK_SIZE bytes, so that only one chunk's
+    worth of lines is ever held in memory."""
+    base = 0
+    while base < len(buf):
+        newline = buf.rfind(b"\n", base, base + CHUNK_SIZE)
+        if newline < 0:
+            newline = buf.find(b"\n", base + CHUNK_SIZE)
+        stop = len(buf) if newline < 0 else newline + 1
+        yield base, buf[base:stop]
+        base = stop
+
+
+def iter_words(path):
+    """Yields the words in the file at path one at a time, in file
+    order, without reading the whole file into a list."""
+    buf = _open_buffer(path)
+    try:
+        for _, chunk in _chunks(buf):
+            for line in chunk.decode("utf-8").split("\n"):
+                word = line.rstrip("\r")
+                if word:
+                    yield word
+    finally:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+
+
+class MappedVocabulary(Sequence):
+    """A sorted, read-only sequence of the words in a file. Only the
+    offsets of the words are kept; each word is decoded from the
+    memory-mapped file when it is compared or returned."""
+
+    def __init__(self, path):
+        """Maps the file at path and indexes its words in sorted
+        order. UTF-8 bytes sort in code point order, so the words
+        are ordered as the equivalent str objects would be."""
+        self._buffer = _open_buffer(path)
+        typecode = "I" if len(self._buffer) < 1 << 32 else "Q"
+        self._starts = array(typecode)
+        self._stops = array(typecode)
+        isSorted = True
+        previous = None
+        for offset, chunk in _chunks(self._buffer):
+            for line in chunk.split(b"\n"):
+                word = line.rstrip(b"\r")
+                if word:
+                    if previous is not None and word < previous:
+                        isSorted = False
+                    previous = word
+                    self._starts.append(offset)
+                    self._stops.append(offset + len(word))
+                offset += len(line) + 1
+        if not isSorted:
+            order = sorted(range(len(self._starts)), key=self._raw)
+            self._starts = array(typecode, [self._starts[i] for i in order])
+            self._stops = array(typecode, [self._stops[i] for i in order])
+
+    def _raw(self, index):
+        """Returns the word at index as bytes."""
+        return self._buffer[self._starts[index]:self._stops[index]]
+
+    def __len__(self):
+        """Returns the number of words in self."""
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        """Returns the word at index, decoded on demand."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self._raw(index).decode("utf-8")
+
+    def close(self):
+        """Releases the memory map. The sequence cannot be used
+        afterwards."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excInfo):
+        self.close()